@@ -227,10 +227,13 @@ def getFold(X,Y,group, indices):
     return X_train, Y_train, g_train, X_test, Y_test, g_test
 
 def updateRuleSet(rule_set, rules):
+    #Rules of a rule model are views of its stores, keep a dense copy
+    if rules is None:
+        return rule_set
     if rule_set is None:
-        rule_set = rules
+        rule_set = np.asarray(rules)
     else:
-        rule_set = np.unique(np.concatenate([rule_set,rules]), axis = 0)
+        rule_set = np.unique(np.concatenate([np.asarray(rule_set),np.asarray(rules)]), axis = 0)
     
     return rule_set
 
@@ -3,8 +3,12 @@ import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 import time
+import os
 from DNFRuleModel import DNFRuleModel
 from MasterModel import MasterModel
+from CompiledRuleSet import CompiledRuleSet
+from DualStabilizer import DualStabilizer
+from RuleSet import RuleSet
 from rule_generator.GeneralRuleGenerator import GeneralRuleGenerator
 from fairness_modules import *
 from master_model import *
@@ -29,8 +33,14 @@ class Classifier(object):
         self.numIter = 0
         self.args = args
         self.mip_results = []
+        self.lp_bounds = []
+        self.gapTol = args['cgGapTol'] if 'cgGapTol' in args else None
+        self.filterInPlace = args['filterInPlace'] if 'filterInPlace' in args else True
+        self.checkpointPath = args['checkpointPath'] if 'checkpointPath' in args else None
+        self.checkpointEvery = args['checkpointEvery'] if 'checkpointEvery' in args else 10
         self.final_mip = 0
         self.final_ip = 0
+        self.telemetry = {}
         fairness_module = args['fairness_module'] if 'fairness_module' in args else fairness_module
         
         # Map parameters to instantiated objects
@@ -39,6 +49,9 @@ class Classifier(object):
         self.initRuleGenerator(ruleGenerator)
         self.initMasterModel(master_model)
         
+        #Optional smoothing of the duals passed to the pricing problem
+        self.stabilizer = DualStabilizer(self.args)
+        
     def fit(self, initial_rules = None, verbose = False, timeLimit = None, 
             timeLimitPricing = None, colGen = True, rule_filter = False):
         '''
@@ -62,76 +75,233 @@ class Classifier(object):
         if timeLimit is not None:
             start_time = time.perf_counter()
         
-        while colGen:
-            self.numIter += 1
-            # Solve relaxed version of restricted problem
-            if verbose:
-                print('Solving Restricted LP')
+        startIter = self.numIter
+        self.telemetry['pricingCalls'] = 0
+        self.ruleGen.resetStats()
+        
+        #Pricing processes (if any) are stopped however the loop ends
+        try:
+            while colGen:
+                self.numIter += 1
+                # Solve relaxed version of restricted problem
+                if verbose:
+                    print('Solving Restricted LP')
             
-            master_solve = time.perf_counter()
-            results = self.master.solve(verbose = verbose, relax = True)
+                master_solve = time.perf_counter()
+                results = self.master.solve(verbose = verbose, relax = True)
             
-            results['verbose'] = verbose
-            self.mip_results.append(results['obj'])
+                #Re-insert pooled columns that price out before generating new rules, then age/purge columns
+                while self.master.columnPool.reinsert() > 0:
+                    results = self.master.solve(verbose = verbose, relax = True)
+                self.master.columnPool.update()
             
-            if timeLimitPricing is not None:
-                results['timeLimit'] = timeLimitPricing
+                results['verbose'] = verbose
+                self.mip_results.append(results['obj'])
             
-            if timeLimit is not None:
-                results['timeLeft'] = time.perf_counter() - start_time
+                if timeLimitPricing is not None:
+                    results['timeLimit'] = timeLimitPricing
+            
+                if timeLimit is not None:
+                    results['timeLeft'] = time.perf_counter() - start_time
 
-            # Generate new candidate rules
-            if verbose:
-                print('Generating Rule')
-            rule_gen = time.perf_counter()
-            ruleFlag, rules = self.ruleGen.generateRule(results)
-        
-            # If no new rules generated exit out and solve master to optimality
-            if ruleFlag:
-                if verbose:
-                    print('Adding %d new rule(s)'%len(rules))
-                self.master.addRule(rules)
-            else:
+                # Generate new candidate rules
                 if verbose:
-                    print('No new rules generated.')
-                break
-                            
-            if timeLimit is not None: 
-                if time.perf_counter() - start_time > timeLimit:
-                    print('Time limit for column generation exceeded. Solving MIP.')
+                    print('Generating Rule')
+                rule_gen = time.perf_counter()
+                ruleFlag, rules = self.ruleGen.generateRule(self.stabilizer.smooth(results))
+                self.telemetry['pricingCalls'] += 1
+                trueDuals = not self.stabilizer.smoothing
+            
+                #Fall back to the true duals if none of the new rules priced with the smoothed duals has 
+                #a negative reduced cost with the true duals
+                if self.stabilizer.smoothing:
+                    if not ruleFlag or not self.pricesOut(rules):
+                        ruleFlag, rules = self.ruleGen.generateRule(self.stabilizer.mispriced())
+                        self.telemetry['pricingCalls'] += 1
+                        trueDuals = True
+                    else:
+                        self.stabilizer.accept()
+            
+                #Lower bound on the LP optimum (only if pricing used the true duals)
+                bound = self.lagrangianBound(results['obj']) if trueDuals else None
+                self.lp_bounds.append(bound)
+        
+                # If no new rules generated exit out and solve master to optimality
+                if ruleFlag:
+                    if verbose:
+                        print('Adding %d new rule(s)'%len(rules))
+                    self.master.columnPool.addRule(rules)
+                else:
+                    if verbose:
+                        print('No new rules generated.')
                     break
+            
+                #Periodic checkpoint of the column generation state (see resume)
+                if self.checkpointPath is not None and self.numIter % self.checkpointEvery == 0:
+                    self.checkpoint(self.checkpointPath)
+            
+                #Stop once the LP objective is close enough to the bound
+                if bound is not None and self.gapTol is not None:
+                    if self.relativeGap(results['obj'], bound) <= self.gapTol:
+                        if verbose:
+                            print('Column generation gap below tolerance (bound %.4f).'%bound)
+                        break
+                            
+                if timeLimit is not None: 
+                    if time.perf_counter() - start_time > timeLimit:
+                        print('Time limit for column generation exceeded. Solving MIP.')
+                        break
+        finally:
+            self.ruleGen.close()
         
         # Solve master problem to optimality
         if verbose:
             print('Solving final master problem to integer optimality')
         
+        #Purged columns are candidates for the integer model as well (unless args['restoreColumnPool'] = False)
+        if 'restoreColumnPool' not in self.args or self.args['restoreColumnPool']:
+            self.master.columnPool.restore()
+        
+        #Previous fitted rule set is used as an incumbent for the integer model
+        if self.fitRuleSet is not None:
+            self.master.mipStart.setRuleSet(self.fitRuleSet)
+        
         if rule_filter:
             results = self.filterSolveMIP(verbose = verbose)
         else:
             results = self.master.solve(verbose = verbose, relax = False)
                     
-        #self.fitBestRulesAccuracy(self.master.getAllSolutions())
+        #self.fitBestRulesAccuracy()
         self.fitRuleSet = results['ruleSet']
         self.final_mip = self.mip_results[-1] if colGen else -1
         self.final_ip = results['obj']
         
+        #Column generation telemetry (compare iterations/pricing calls with and without stabilization)
+        self.telemetry['iterations'] = self.numIter - startIter
+        bounds = [b for b in self.lp_bounds if b is not None]
+        self.telemetry['lagrangianBound'] = max(bounds) if len(bounds) > 0 else None
+        self.telemetry['stabilizer'] = self.stabilizer.stats()
+        self.telemetry['columnPool'] = self.master.columnPool.stats()
+        self.telemetry['pricing'] = self.ruleGen.stats()
+        
         #Return final rules
         return self
     
+    def lagrangianBound(self, lp_obj):
+        '''
+        Lagrangian (Lasdon) lower bound on the optimal LP value of the full master problem:
+        LP objective + (max total weight of rules)*(most negative reduced cost found by pricing)
+        - Returns None if pricing does not report its reduced cost or the master has no weight bound
+        - Only exact pricing (the IP generators on the full data) reports a bound, None otherwise
+        '''
+        minReducedCost = self.ruleGen.minReducedCost
+        if minReducedCost is None or self.master.maxRuleWeight is None:
+            return None
+        
+        return lp_obj + self.master.maxRuleWeight*min(minReducedCost, 0)
+    
+    def pricesOut(self, rules):
+        '''
+        True if any of the rules that are new to the master has a negative reduced cost with the true duals
+        '''
+        newRules = self.ruleMod.getNewRules(RuleSet.asRuleSet(rules, self.ruleMod.X.shape[1]))
+        if len(newRules) == 0:
+            return False
+        
+        return np.any(self.ruleGen.computeReducedCosts(newRules, self.stabilizer.trueResults) < 0)
+    
+    def relativeGap(self, lp_obj, bound):
+        return (lp_obj - bound)/max(abs(lp_obj), 1e-10)
+    
+    def checkpoint(self, path):
+        '''
+        Writes the column generation state to path (npz): rules (CSR), coverage matrices (bit-packed),
+        iteration counters, LP objectives/bounds and the basis of the restricted LP
+        - Pooled columns are stored as rules only
+        - The file is replaced atomically so a crash while writing keeps the previous checkpoint
+        '''
+        rules = self.ruleMod.rules if self.ruleMod.numRules() > 0 else RuleSet(numFeatures = self.ruleMod.X.shape[1])
+        pool = self.master.columnPool.rules
+        pool = pool if pool is not None else RuleSet(numFeatures = self.ruleMod.X.shape[1])
+        lp = self.master.lp
+        numPos, numNeg = int(np.sum(self.ruleMod.Y)), int(np.sum(~self.ruleMod.Y))
+        K_p = self.ruleMod.K_p if self.ruleMod.K_p is not None else np.zeros((numPos, 0), dtype = np.bool_)
+        K_z = self.ruleMod.K_z if self.ruleMod.K_z is not None else np.zeros((numNeg, 0), dtype = np.bool_)
+        
+        state = {'numFeatures': rules.numFeatures, 'numPos': numPos, 'numNeg': numNeg,
+                 'ruleIndices': rules.indices, 'ruleOffsets': rules.offsets,
+                 'poolIndices': pool.indices, 'poolOffsets': pool.offsets,
+                 'K_p': np.packbits(K_p, axis = 0), 'K_z': np.packbits(K_z, axis = 0),
+                 'numIter': self.numIter, 'mip_results': np.array(self.mip_results, dtype = np.float64),
+                 'lp_bounds': np.array([np.nan if b is None else b for b in self.lp_bounds], dtype = np.float64),
+                 'hasBasis': lp.vBasis is not None,
+                 'vBasis': np.array(lp.vBasis if lp.vBasis is not None else [], dtype = np.int32),
+                 'cBasis': np.array(lp.cBasis if lp.cBasis is not None else [], dtype = np.int32),
+                 'solution': lp.solution if lp.solution is not None else np.zeros(0)}
+        
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, **state)
+        os.replace(path + '.tmp', path)
+    
+    def resume(self, path, **kwargs):
+        '''
+        Restores a checkpoint written during fit (args['checkpointPath']) and continues column generation
+        - The classifier must be built with the same data and arguments as the checkpointed one
+        - Rules are added to the master in bulk with their stored coverage, the LP is warm-started from the saved basis
+        - Pooled columns are added back as active columns
+        - kwargs are passed to fit
+        '''
+        if self.ruleMod.numRules() > 0:
+            raise Exception('Can only resume a classifier without rules!')
+        
+        with np.load(path) as state:
+            numPos, numNeg = int(state['numPos']), int(state['numNeg'])
+            if (int(state['numFeatures']) != self.ruleMod.X.shape[1] or numPos != int(np.sum(self.ruleMod.Y)) 
+                or numNeg != int(np.sum(~self.ruleMod.Y))):
+                raise Exception('Checkpoint does not match the data!')
+            
+            rules = RuleSet(state['ruleIndices'], state['ruleOffsets'], int(state['numFeatures']))
+            pool = RuleSet(state['poolIndices'], state['poolOffsets'], int(state['numFeatures']))
+            K_p = np.unpackbits(state['K_p'], axis = 0, count = numPos).astype(np.bool_)
+            K_z = np.unpackbits(state['K_z'], axis = 0, count = numNeg).astype(np.bool_)
+            
+            self.numIter = int(state['numIter'])
+            self.mip_results = list(state['mip_results'])
+            self.lp_bounds = [None if np.isnan(b) else b for b in state['lp_bounds']]
+            
+            if len(rules) > 0:
+                self.master.addRule(rules, (K_p, K_z))
+            if bool(state['hasBasis']):
+                self.master.lp.setBasis(list(state['vBasis']), list(state['cBasis']))
+            if len(state['solution']) > 0:
+                self.master.lp.solution = state['solution']
+            if len(pool) > 0:
+                self.master.addRule(pool)
+        
+        return self.fit(**kwargs)
+    
     def filterRules(self, K = 1000, verbose = False):
         '''
         Function to filter rules by solving MIP, and computing reduced costs for all rules. 
         Retains best K
+        - If args['filterInPlace'] (default) the other columns are removed from the existing master and 
+          rule model, otherwise both are rebuilt from the retained rules
         '''
         #Solve relaxed master problem
         results = self.master.solve(verbose = verbose, relax = True)
         
         #Compute reduced costs of all rules
         reduced_costs = self.master.getRC()
+        order = np.argsort(reduced_costs)
         
         #Retain best rules
-        reduced_rule_set = self.ruleMod.rules[np.argsort(reduced_costs)[:K]]
-        self.reset(reduced_rule_set)
+        if self.filterInPlace:
+            if len(order) > K:
+                self.master.removeColumns(np.sort(order[K:]))
+                self.master.columnPool.resetAges()
+        else:
+            reduced_rule_set = self.ruleMod.rules[order[:K]]
+            self.reset(reduced_rule_set)
 
     def filterSolveMIP(self, K = 1000, verbose = False):
         '''
@@ -164,6 +334,17 @@ class Classifier(object):
         
         return self.ruleMod.predict(X, self.fitRuleSet)
     
+    def compile(self):
+        '''
+        Function to compile the fitted rule set into an immutable low-latency predictor
+        (exposes predict_one and predict_batch)
+        '''
+        if self.fitRuleSet is None:
+            raise Exception("Model not fit. Can't compile rule set!")
+        
+        return CompiledRuleSet(self.fitRuleSet, self.ruleMod.X.shape[1], 
+                               default = sum(self.ruleMod.Y) >= len(self.ruleMod.Y)/2)
+    
     def predictHamming(self, X):
         '''
         Function to predict class labels, specifies number of rules met, using the fitted rule set
@@ -176,21 +357,31 @@ class Classifier(object):
         
         return self.ruleMod.predict(X, self.fitRuleSet, binary = False)
 
-    def fitBestRulesAccuracy(self, solutions):
+    def fitBestRulesAccuracy(self, solutions = None):
         '''
         Function to pick the final rule set based on accuracy instead of Hamming Loss
+        - solutions is a list of rule sets, defaults to the solution pool of the last master solve
+        - Solutions are scored from the stored coverage columns of the rule model
         '''
+        if solutions is None:
+            selected = self.master.getSolutionPool()
+        else:
+            selected = np.zeros((len(solutions), self.ruleMod.numRules()), dtype = np.bool_)
+            for i, sol in enumerate(solutions):
+                keys = self.ruleMod.ruleKeys(RuleSet.asRuleSet(sol, self.ruleMod.X.shape[1])) if len(sol) > 0 else []
+                if any(key not in self.ruleMod.ruleIndex for key in keys):
+                    raise Exception('Solution contains rules that are not in the rule model!')
+                selected[i, [self.ruleMod.ruleIndex[key] for key in keys]] = True
+        
+        if len(selected) == 0:
+            return
+        
         #Get accuracies for all rule set solutions
-        accuracies = []
-        for sol in solutions:
-            if len(sol) == 0:
-                pred = np.repeat(sum(self.ruleMod.Y) >= len(self.ruleMod.Y)/2, self.ruleMod.X.shape[0])
-            else:
-                pred = self.ruleMod.predict(self.ruleMod.X, sol)
-            accuracies.append(sum(pred == self.ruleMod.Y)/len(self.ruleMod.Y))
-        
-        #Return best ruleset
-        self.fitRuleSet = solutions[np.argmax(accuracies)]
+        accuracies, hamming = self.ruleMod.evaluateSolutions(selected)
+        
+        #Return best ruleset (ties broken by Hamming loss)
+        best = np.lexsort((hamming, -accuracies))[0]
+        self.fitRuleSet = self.ruleMod.rules[selected[best]] if self.ruleMod.numRules() > 0 else []
          
     
     def initRuleModel(self, X, Y, ruleModel):
@@ -200,7 +391,7 @@ class Classifier(object):
         '''
         
         if ruleModel == 'DNF':
-            self.ruleMod = DNFRuleModel(X, Y)
+            self.ruleMod = DNFRuleModel(X, Y, self.args)
         else:
             raise Exception('No associated rule model found.')
     
@@ -0,0 +1,115 @@
+import numpy as np
+
+class ColumnStore(object):
+    '''
+    Growable array used to store rules and their coefficients.
+    - Entries are appended along the first axis of a buffer whose capacity doubles when full,
+      so adding columns over many iterations has amortized linear cost
+    - If asColumns = True, entries are exposed as the columns of a matrix (i.e. K_p, K_z)
+    - view/slice return views into the buffer (no copies), they are invalidated by the next reallocation
+    '''
+
+    def __init__(self, entryShape = (), dtype = np.float64, asColumns = False, initialCapacity = 64):
+        self.entryShape = tuple(entryShape)
+        self.dtype = dtype
+        self.asColumns = asColumns
+        self.initialCapacity = max(int(initialCapacity), 1)
+
+        #Counters exposing how much work/memory the store uses
+        self.reallocations = 0
+        self.size = 0
+        self.buffer = np.empty((0,) + self.entryShape, dtype = self.dtype)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return self.buffer.shape[0]
+
+    @property
+    def nbytes(self):
+        '''
+        Bytes held by the store (including unused capacity)
+        '''
+        return self.buffer.nbytes
+
+    def reserve(self, numEntries):
+        '''
+        Makes sure the buffer can hold numEntries more entries, doubling capacity if needed
+        '''
+        required = self.size + numEntries
+        if required <= self.capacity:
+            return
+
+        new_capacity = max(self.capacity, self.initialCapacity)
+        while new_capacity < required:
+            new_capacity *= 2
+
+        new_buffer = np.empty((new_capacity,) + self.entryShape, dtype = self.dtype)
+        new_buffer[:self.size] = self.buffer[:self.size]
+        self.buffer = new_buffer
+        self.reallocations += 1
+
+    def append(self, block):
+        '''
+        Appends a block of entries (columns if asColumns = True, rows otherwise)
+        Returns a view of the newly stored entries
+        '''
+        block = np.asarray(block, dtype = self.dtype)
+        if self.asColumns:
+            block = block.reshape(self.entryShape + (-1,)).T
+        else:
+            block = block.reshape((-1,) + self.entryShape)
+
+        start = self.size
+        self.reserve(block.shape[0])
+        self.buffer[start:start + block.shape[0]] = block
+        self.size += block.shape[0]
+
+        return self.slice(start, self.size)
+
+    def extend(self, numEntries):
+        '''
+        Adds numEntries (uninitialized) entries and returns a writable view of them
+        '''
+        start = self.size
+        self.reserve(numEntries)
+        self.size += numEntries
+
+        return self.slice(start, self.size)
+
+    def truncate(self, size):
+        '''
+        Drops all entries after the first size entries
+        '''
+        self.size = min(self.size, size)
+
+    def compact(self, keep):
+        '''
+        Keeps only the entries selected by keep (boolean mask or indices), in their current order
+        '''
+        kept = self.buffer[:self.size][keep]
+        self.size = kept.shape[0]
+        self.buffer[:self.size] = kept
+
+    def slice(self, start = 0, stop = None):
+        '''
+        Returns a view of entries start to stop
+        '''
+        stop = self.size if stop is None else min(stop, self.size)
+        entries = self.buffer[start:stop]
+        return entries.T if self.asColumns else entries
+
+    def view(self):
+        '''
+        Returns a view of all the stored entries
+        '''
+        return self.slice(0, self.size)
+
+    def clear(self):
+        '''
+        Removes all entries and releases the buffer
+        '''
+        self.size = 0
+        self.buffer = np.empty((0,) + self.entryShape, dtype = self.dtype)
@@ -0,0 +1,109 @@
+import numpy as np
+from RuleSet import RuleSet
+
+class CompiledRuleSet(object):
+    '''
+    Immutable low-latency predictor compiled from a fitted rule set.
+    - Rules are stored in a trie so rules sharing literals (ordered by how often they are used) share nodes
+    - A sample is classified positive as soon as the first rule it meets is found
+    - default is the prediction used if there are no rules
+    '''
+
+    def __init__(self, rules, numFeatures = None, default = False):
+        rules = RuleSet.asRuleSet(rules, numFeatures)
+        self.numRules = len(rules)
+        self.default = bool(default)
+
+        #Literal index arrays of every rule (read-only)
+        self.ruleFeatures = tuple(self.freeze(features) for features in rules)
+
+        #An empty rule is met by every sample
+        self.alwaysTrue = any(len(features) == 0 for features in self.ruleFeatures)
+
+        self.buildTrie(rules)
+
+    def freeze(self, array):
+        array = np.array(array, dtype = np.int64)
+        array.flags.writeable = False
+        return array
+
+    def buildTrie(self, rules):
+        '''
+        Builds a trie over the rules, with literals sorted by decreasing frequency to share prefixes
+        '''
+        counts = np.bincount(rules.indices, minlength = 1) if len(rules.indices) > 0 else np.zeros(1)
+
+        root = {}
+        for features in self.ruleFeatures:
+            node = root
+            for f in sorted(features.tolist(), key = lambda f: (-counts[f], f)):
+                node = node.setdefault(f, {})
+            node[None] = True
+
+        #Flatten trie into tuples (node -> feature, terminal flag, children)
+        feature, terminal, children = [], [], []
+        def flatten(node):
+            ids = []
+            for f in sorted(k for k in node if k is not None):
+                idx = len(feature)
+                feature.append(f)
+                terminal.append(None in node[f])
+                children.append(())
+                ids.append(idx)
+                children[idx] = flatten(node[f])
+            return tuple(ids)
+
+        self.roots = flatten(root)
+        self.nodeFeature = tuple(feature)
+        self.nodeTerminal = tuple(terminal)
+        self.nodeChildren = tuple(children)
+
+    def predict_one(self, x):
+        '''
+        Predicts the class label of a single sample
+        '''
+        if self.numRules == 0:
+            return self.default
+        if self.alwaysTrue:
+            return True
+
+        feature, terminal, children = self.nodeFeature, self.nodeTerminal, self.nodeChildren
+        stack = list(self.roots)
+        while stack:
+            node = stack.pop()
+            if x[feature[node]]:
+                if terminal[node]:
+                    return True
+                stack.extend(children[node])
+
+        return False
+
+    def predict_batch(self, X):
+        '''
+        Predicts the class labels of a batch of samples, rows only descend the trie while
+        they meet the literals on the path and have not met a rule yet
+        '''
+        X = np.asarray(X)
+        if self.numRules == 0:
+            return np.repeat(self.default, X.shape[0])
+        if self.alwaysTrue:
+            return np.ones(X.shape[0], dtype = np.bool_)
+
+        output = np.zeros(X.shape[0], dtype = np.bool_)
+        allRows = np.arange(X.shape[0])
+        stack = [(node, allRows) for node in self.roots]
+        while stack:
+            node, rows = stack.pop()
+
+            #Rows that reach this node and are not classified yet
+            rows = rows[~output[rows]]
+            rows = rows[X[rows, self.nodeFeature[node]].astype(np.bool_)]
+            if len(rows) == 0:
+                continue
+
+            if self.nodeTerminal[node]:
+                output[rows] = True
+            else:
+                stack.extend((child, rows) for child in self.nodeChildren[node])
+
+        return output
@@ -0,0 +1,77 @@
+import numpy as np
+
+class DataSource(object):
+    '''
+    Chunked access to a (samples x features) data matrix, in memory or memory-mapped (np.memmap).
+    Rows are read in chunks of at most memoryBudget bytes, so data larger than RAM can be used.
+    '''
+
+    def __init__(self, X, memoryBudget = None):
+        self.X = X
+        self.shape = X.shape
+        self.dtype = X.dtype
+        self.memoryBudget = memoryBudget if memoryBudget is not None else 256*1024**2
+
+        #Chunks hold a multiple of 64 rows (so chunks line up with 64 bit words when packing rows)
+        bytesPerRow = max(X.shape[1]*X.dtype.itemsize, 1)
+        self.chunkSize = max(64, (self.memoryBudget//bytesPerRow)//64*64)
+
+    @classmethod
+    def fromNpy(cls, path, memoryBudget = None):
+        '''
+        Memory-maps a matrix saved with np.save
+        '''
+        return cls(np.load(path, mmap_mode = 'r'), memoryBudget)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def chunks(self, dtype = None):
+        '''
+        Iterates over (start, stop, rows) chunks of the data
+        - If dtype is given, rows are cast to it one chunk at a time (chunks are sized for the cast rows)
+        '''
+        chunkSize = self.chunkSize
+        if dtype is not None:
+            bytesPerRow = max(self.shape[1]*max(self.dtype.itemsize, np.dtype(dtype).itemsize), 1)
+            chunkSize = max(64, (self.memoryBudget//bytesPerRow)//64*64)
+
+        for start in range(0, self.shape[0], chunkSize):
+            stop = min(start + chunkSize, self.shape[0])
+            yield start, stop, np.asarray(self.X[start:stop], dtype = dtype)
+
+    def leftMultiply(self, W):
+        '''
+        Returns W @ X for a (k x samples) matrix W, the data is cast to float64 one chunk at a time
+        '''
+        result = np.zeros((W.shape[0], self.shape[1]))
+        for start, stop, rows in self.chunks(np.float64):
+            result += W[:, start:stop] @ rows
+
+        return result
+
+    def takeRows(self, row_samples):
+        '''
+        Returns the rows selected by a boolean mask (read chunk by chunk)
+        '''
+        X_sample = np.empty((int(np.sum(row_samples)), self.shape[1]), dtype = self.dtype)
+
+        filled = 0
+        for start, stop, rows in self.chunks():
+            selected = rows[row_samples[start:stop]]
+            X_sample[filled:filled+len(selected)] = selected
+            filled += len(selected)
+
+        return X_sample
+
+    def toArray(self):
+        '''
+        Returns the full data as an array without copying it (memory-mapped data stays on disk and is 
+        paged in on access), memory-mapped data larger than memoryBudget raises an exception
+        '''
+        if isinstance(self.X, np.memmap):
+            numBytes = self.shape[0]*self.shape[1]*self.dtype.itemsize
+            if numBytes > self.memoryBudget:
+                raise Exception('Data (%d bytes) exceeds the memory budget (%d bytes), use row sampling '
+                                '(args[\'rowSample\']) or increase args[\'memoryBudget\']!'%(numBytes, self.memoryBudget))
+        return np.asarray(self.X)
@@ -0,0 +1,103 @@
+import numpy as np
+
+#Dual values of the restricted master passed to the pricing problem
+DUAL_KEYS = ['mu', 'alpha', 'coeff', 'lam']
+
+class DualStabilizer(object):
+    '''
+    Wentges smoothing of the duals passed from the restricted master to the pricing problem.
+    - Pricing uses alpha*center + (1-alpha)*duals, where the stability center starts at the first LP
+      duals and moves to the smoothed duals every time they price out new columns
+    - If none of the new columns generated with the smoothed duals has a negative reduced cost with 
+      the true LP duals (mispricing), pricing is repeated with the true LP duals
+    - Duals are not smoothed when the center coincides with the LP duals (i.e. the LP did not change
+      since a mispricing), pricing would only be repeated with the same duals
+    - alpha = args['dualSmoothing'] (0 disables stabilization)
+    '''
+
+    def __init__(self, args = {}):
+        self.alpha = args['dualSmoothing'] if 'dualSmoothing' in args else 0
+        if self.alpha < 0 or self.alpha >= 1:
+            raise Exception('Dual smoothing parameter must be in [0, 1).')
+
+        self.center = None
+        self.smoothed = None
+        self.trueResults = None
+        #True if the duals of the last call to smooth were smoothed
+        self.smoothing = False
+
+        #Counters
+        self.smoothedSteps = 0
+        self.mispricings = 0
+
+    @property
+    def active(self):
+        return self.alpha > 0
+
+    def getDuals(self, results):
+        duals = {key: np.array(results[key], dtype = np.float64) for key in DUAL_KEYS
+                 if key in results and results[key] is not None}
+        duals['fairDuals'] = dict(results['fairDuals']) if 'fairDuals' in results else {}
+        return duals
+
+    def smooth(self, results):
+        '''
+        Returns the results of the master with the duals used for pricing
+        (the true results are kept to fall back on in case of a mispricing)
+        '''
+        self.trueResults = dict(results)
+        self.smoothing = False
+        if not self.active:
+            return results
+
+        duals = self.getDuals(results)
+        if self.center is None or any(key not in duals or self.center[key].shape != duals[key].shape
+                                      for key in DUAL_KEYS if key in self.center):
+            self.center = duals
+            self.smoothed = duals
+            return dict(self.trueResults)
+
+        if self.atCenter(duals):
+            return dict(self.trueResults)
+
+        #Convex combination of stability center and LP duals
+        self.smoothed = {key: self.alpha*self.center[key] + (1-self.alpha)*duals[key]
+                         for key in DUAL_KEYS if key in duals}
+        self.smoothed['fairDuals'] = {name: self.alpha*self.center['fairDuals'].get(name, pi) + (1-self.alpha)*pi
+                                      for name, pi in duals['fairDuals'].items()}
+        self.smoothedSteps += 1
+        self.smoothing = True
+
+        smoothedResults = dict(self.trueResults)
+        smoothedResults.update(self.smoothed)
+        smoothedResults['lam'] = float(self.smoothed['lam']) if 'lam' in self.smoothed else results['lam']
+
+        return smoothedResults
+
+    def atCenter(self, duals):
+        '''
+        True if the LP duals are equal to the stability center
+        '''
+        if any(key not in self.center or not np.array_equal(self.center[key], duals[key]) 
+               for key in DUAL_KEYS if key in duals):
+            return False
+
+        return self.center['fairDuals'] == duals['fairDuals']
+
+    def accept(self):
+        '''
+        Smoothed duals priced out new columns (with the true duals), they become the new stability center
+        '''
+        if self.smoothed is not None:
+            self.center = self.smoothed
+
+    def mispriced(self):
+        '''
+        Returns the true results of the master for pricing again (the center is reset to the LP duals)
+        '''
+        self.mispricings += 1
+        self.center = self.getDuals(self.trueResults)
+        return dict(self.trueResults)
+
+    def stats(self):
+        return {'alpha': self.alpha, 'smoothedSteps': self.smoothedSteps, 'mispricings': self.mispricings}
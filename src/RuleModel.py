@@ -1,5 +1,9 @@
 import pandas as pd
 import numpy as np
+from coverage_engine import *
+from ColumnStore import ColumnStore
+from RuleSet import RuleSet
+from DataSource import DataSource
 
 class RuleModel(object):
     '''
@@ -10,17 +14,42 @@ class RuleModel(object):
         - Specify how to compute the complexity of a rule (computeRuleC)
     '''
     
-    def __init__(self, X, Y):
+    def __init__(self, X, Y, args = {}):
+        '''
+        - X can be an array, an np.memmap or a DataSource (memmaps are read in chunks of args['memoryBudget'] bytes)
+        '''
         #Save data
-        self.X = X
+        memoryBudget = args['memoryBudget'] if 'memoryBudget' in args else None
+        self.data = X if isinstance(X, DataSource) else DataSource(X, memoryBudget)
+        self.X = self.data.X
         self.Y = Y
         
+        #Set-up the engine used to compute rule coverage (packs the data once)
+        coverageBackend = args['coverageBackend'] if 'coverageBackend' in args else 'bitset'
+        self.initCoverageEngine(coverageBackend, args)
+        
+        #Chunked engine used to score data samples against rules
+        self.scorer = BatchScorer.BatchScorer(args)
+        
         #Initialize constants
         self.reset()
+    
+    def initCoverageEngine(self, coverageBackend, args = {}):
+        '''
+        Function that maps string coverage engines to objects
+           - To add a new coverage engine simply add the object to the if control flow
+        '''
+        if coverageBackend == 'bitset':
+            self.coverage = BitsetCoverage.BitsetCoverage(self.data, self.Y, args)
+        elif coverageBackend == 'dense':
+            self.coverage = DenseCoverage.DenseCoverage(self.data, self.Y, args)
+        else:
+            raise Exception('No associated coverage engine found.')
         
-    def computeK(self, rules):
+    def computeK(self, rules, K_p = None, K_z = None):
         '''
         Takes a set of rules and returns K_p, and K_z coefficient
+        - If K_p/K_z are supplied (preallocated columns), results are written into them
         - Needs to be specified in the child class
         '''
         pass
@@ -39,6 +68,13 @@ class RuleModel(object):
         '''
         pass
     
+    def ruleKeys(self, rules):
+        '''
+        Takes a set of rules and returns a hashable key for each rule (used to index stored rules)
+        - Needs to be specified in the child class
+        '''
+        pass
+    
     def predict(self, X, rules):
         '''
         Makes class label predictions given data samples and a set of rules
@@ -47,31 +83,156 @@ class RuleModel(object):
         pass
     
     def reset(self):
-        self.rules = None
-        self.K_p = None 
-        self.K_z = None
-        self.C = None 
-
+        '''
+        Clears all rules, rules and coefficients are kept in growable column stores
+        '''
+        self.ruleIndicesStore = ColumnStore((), np.int32)
+        self.ruleOffsetsStore = ColumnStore((), np.int64)
+        self.ruleOffsetsStore.append([0])
+        self.K_pStore = ColumnStore((int(np.sum(self.Y)),), np.bool_, asColumns = True)
+        self.K_zStore = ColumnStore((int(np.sum(~self.Y)),), np.bool_, asColumns = True)
+        self.CStore = ColumnStore((), np.float64)
+        
+        #Index mapping the key of each stored rule to its column
+        self.ruleIndex = {}
+    
+    #rules, K_p, K_z and C are views of the stores (no copy), they are rewritten in place when rules are
+    #removed (removeRules) or a failed addRule is rolled back, copy them (i.e. np.array) to keep them
+    @property
+    def rules(self):
+        if self.numRules() == 0:
+            return None
+        return RuleSet(self.ruleIndicesStore.view(), self.ruleOffsetsStore.view(), self.X.shape[1])
+    
+    def numRules(self):
+        return len(self.ruleOffsetsStore) - 1
+    
+    @property
+    def K_p(self):
+        return self.K_pStore.view() if len(self.K_pStore) > 0 else None
     
-    def addRule(self, rules):
+    @property
+    def K_z(self):
+        return self.K_zStore.view() if len(self.K_zStore) > 0 else None
+    
+    @property
+    def C(self):
+        return self.CStore.view() if len(self.CStore) > 0 else None
+    
+    def evaluateSolutions(self, selected):
+        '''
+        Training accuracy and Hamming loss of rule set solutions computed from the stored coverage columns
+        - selected is a boolean matrix (solutions x rules) of the rules in each solution
+        - Empty solutions predict the majority class (as Classifier.predict)
+        '''
+        numPos, numNeg = int(np.sum(self.Y)), int(np.sum(~self.Y))
+        selected = np.atleast_2d(np.asarray(selected, dtype = np.float64))
+        K_p = self.K_p if self.K_p is not None else np.zeros((numPos, 0), dtype = np.bool_)
+        K_z = self.K_z if self.K_z is not None else np.zeros((numNeg, 0), dtype = np.bool_)
+        
+        #Number of selected rules met by each positive/negative sample (one matrix product per class)
+        posMet = K_p @ selected.T
+        negMet = K_z @ selected.T
+        
+        errors = np.sum(posMet == 0, axis = 0) + np.sum(negMet > 0, axis = 0)
+        hamming = np.sum(posMet == 0, axis = 0) + np.sum(negMet, axis = 0)
+        
+        #Empty rule sets predict the majority class
+        empty = np.sum(selected, axis = 1) == 0
+        majorityErrors = numNeg if numPos >= len(self.Y)/2 else numPos
+        errors = np.where(empty, majorityErrors, errors)
+        hamming = np.where(empty, majorityErrors, hamming)
+        
+        return 1 - errors/len(self.Y), hamming
+    
+    def getStorageStats(self):
+        '''
+        Returns the number of reallocations and bytes held by each column store
+        '''
+        stores = {'ruleIndices': self.ruleIndicesStore, 'ruleOffsets': self.ruleOffsetsStore, 
+                  'K_p': self.K_pStore, 'K_z': self.K_zStore, 'C': self.CStore}
+        return {name: {'reallocations': store.reallocations, 'nbytes': store.nbytes} 
+                for name, store in stores.items()}
+    
+    def addRule(self, rules, coverage = None):
         '''
         General function for taking new rules and computing coefficients
+        - Rules can be a RuleSet or in the dense format (one row per rule)
+        - coverage = (K_p, K_z) of the rules skips computing it (i.e. when resuming from a checkpoint), 
+          new rules are then kept in the given order
         '''
         #Confirm rules are new
-        new_rules = self.getNewRules(rules)
+        rules = RuleSet.asRuleSet(rules, self.X.shape[1])
+        if coverage is None:
+            new_rules = self.getNewRules(rules)
+        else:
+            isNew = self.newRuleMask(rules)
+            new_rules = rules[isNew]
         
         #If there are no new rules, return empty arrays
         if len(new_rules) == 0:
             return [], [], [], []
         
-        K_p, K_z_coeff, K_z = self.computeK(new_rules)
+        #Coverage is written directly into new (preallocated) columns of the K_p/K_z stores
+        #The stores are rolled back to their previous length if filling the new columns fails
+        numK = len(self.K_pStore)
+        filled = False
+        try:
+            if coverage is None:
+                K_p, K_z_coeff, K_z = self.computeK(new_rules, self.K_pStore.extend(len(new_rules)), 
+                                                    self.K_zStore.extend(len(new_rules)))
+            else:
+                K_p = self.K_pStore.extend(len(new_rules))
+                K_z = self.K_zStore.extend(len(new_rules))
+                K_p[:] = coverage[0][:, isNew]
+                K_z[:] = coverage[1][:, isNew]
+                K_z_coeff = np.sum(K_z, axis = 0)
+            filled = True
+        finally:
+            if not filled:
+                self.K_pStore.truncate(numK)
+                self.K_zStore.truncate(numK)
         C = self.computeRuleC(new_rules)
         
-        if self.rules is not None:
-            self.rules = np.concatenate([self.rules, new_rules], axis = 0)
-        else:
-            self.rules = new_rules
+        #Store rules/coefficients and hand back views of the stored columns
+        start = self.numRules()
+        self.ruleOffsetsStore.append(new_rules.offsets[1:] + len(self.ruleIndicesStore))
+        self.ruleIndicesStore.append(new_rules.indices)
+        self.ruleIndex.update(zip(self.ruleKeys(new_rules), range(start, self.numRules())))
+        C = self.CStore.append(C)
         
         return K_p, K_z_coeff, C, K_z
     
+    def newRuleMask(self, rules):
+        '''
+        Boolean mask of the rules that are neither stored nor repeated earlier in the set
+        '''
+        seen = set()
+        isNew = np.zeros(len(rules), dtype = np.bool_)
+        for i, key in enumerate(self.ruleKeys(rules)):
+            if key not in self.ruleIndex and key not in seen:
+                isNew[i] = True
+                seen.add(key)
+        
+        return isNew
     
+    def removeRules(self, positions):
+        '''
+        Removes the rules (and their coefficients) stored at the given positions, the remaining
+        rules keep their relative order
+        '''
+        keep = np.ones(self.numRules(), dtype = np.bool_)
+        keep[np.asarray(positions, dtype = np.int64)] = False
+        if np.all(keep):
+            return
+        
+        #Compact coefficient stores and rebuild the rule stores from the kept rules
+        kept_rules = self.rules[keep]
+        self.K_pStore.compact(keep)
+        self.K_zStore.compact(keep)
+        self.CStore.compact(keep)
+        self.ruleIndicesStore.truncate(0)
+        self.ruleIndicesStore.append(kept_rules.indices)
+        self.ruleOffsetsStore.truncate(0)
+        self.ruleOffsetsStore.append(kept_rules.offsets)
+        self.ruleIndex = dict(zip(self.ruleKeys(kept_rules), range(len(kept_rules))))
@@ -0,0 +1,128 @@
+import numpy as np
+import scipy.sparse as sp
+
+class RuleSet(object):
+    '''
+    Compact (CSR-style) container for a set of DNF rules.
+    - indices holds the (sorted) feature indices of every rule, one rule after the other
+    - rule i uses features indices[offsets[i]:offsets[i+1]]
+    - numFeatures is the width of the data (needed to convert back to the dense format)
+    '''
+
+    def __init__(self, indices = None, offsets = None, numFeatures = None):
+        self.indices = np.zeros(0, dtype = np.int32) if indices is None else np.asarray(indices)
+        self.offsets = np.zeros(1, dtype = np.int64) if offsets is None else np.asarray(offsets)
+        self.numFeatures = numFeatures
+
+    @classmethod
+    def fromDense(cls, rules, numFeatures = None):
+        '''
+        Builds a rule set from dense rules (one row per rule, nonzero entries are the features used)
+        '''
+        rules = np.asarray(rules)
+        if rules.ndim == 1:
+            rules = rules.reshape(1, -1) if len(rules) > 0 else rules.reshape(0, 0)
+
+        rows, features = np.nonzero(rules)
+        offsets = np.searchsorted(rows, np.arange(rules.shape[0]+1)).astype(np.int64)
+        numFeatures = rules.shape[1] if numFeatures is None else numFeatures
+
+        return cls(features.astype(np.int32), offsets, numFeatures)
+
+    @classmethod
+    def fromFeatureSets(cls, feature_sets, numFeatures = None):
+        '''
+        Builds a rule set from a list of feature index lists
+        '''
+        feature_sets = [np.unique(np.asarray(f, dtype = np.int32)) for f in feature_sets]
+        offsets = np.zeros(len(feature_sets)+1, dtype = np.int64)
+        offsets[1:] = np.cumsum([len(f) for f in feature_sets])
+        indices = np.concatenate(feature_sets) if len(feature_sets) > 0 else np.zeros(0, dtype = np.int32)
+
+        return cls(indices.astype(np.int32), offsets, numFeatures)
+
+    @classmethod
+    def asRuleSet(cls, rules, numFeatures = None):
+        '''
+        Converts rules in the dense format to a rule set (rule sets are returned as is)
+        '''
+        if isinstance(rules, RuleSet):
+            return rules
+        if len(rules) == 0:
+            return cls(numFeatures = numFeatures)
+        return cls.fromDense(rules, numFeatures)
+
+    def toDense(self, dtype = np.float64):
+        '''
+        Converts rule set to the dense format (one row per rule)
+        '''
+        if self.numFeatures is None:
+            raise Exception('Number of features needed to convert rule set to dense format!')
+
+        dense = np.zeros((len(self), self.numFeatures), dtype = dtype)
+        dense[np.repeat(np.arange(len(self)), self.lengths()), self.indices] = 1
+        return dense
+
+    def __array__(self, dtype = None, copy = None):
+        return self.toDense(np.float64 if dtype is None else dtype)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.indices[self.offsets[i]:self.offsets[i+1]]
+
+    def __getitem__(self, item):
+        '''
+        Integers return the feature indices of a rule, slices/masks/index arrays return a new rule set
+        '''
+        if isinstance(item, (int, np.integer)):
+            item = item + len(self) if item < 0 else item
+            return self.indices[self.offsets[item]:self.offsets[item+1]]
+
+        selected = np.arange(len(self))[item] if isinstance(item, slice) else np.asarray(item)
+        if selected.dtype == np.bool_:
+            selected = np.nonzero(selected)[0]
+        selected = selected.astype(np.int64)
+
+        #Gather the features of the selected rules
+        lengths = self.lengths()[selected]
+        offsets = np.zeros(len(selected)+1, dtype = np.int64)
+        offsets[1:] = np.cumsum(lengths)
+        gather = np.repeat(self.offsets[selected] - offsets[:-1], lengths) + np.arange(offsets[-1])
+
+        return RuleSet(self.indices[gather], offsets, self.numFeatures)
+
+    def __repr__(self):
+        return 'RuleSet(%d rules, %d features)'%(len(self), -1 if self.numFeatures is None else self.numFeatures)
+
+    def lengths(self):
+        '''
+        Returns number of features used by each rule
+        '''
+        return np.diff(self.offsets)
+
+    def keys(self):
+        '''
+        Returns hashable key for each rule (tuple of feature indices)
+        '''
+        indices = self.indices.tolist()
+        offsets = self.offsets.tolist()
+        return [tuple(indices[offsets[i]:offsets[i+1]]) for i in range(len(self))]
+
+    def mapFeatures(self, feature_map, numFeatures):
+        '''
+        Returns rule set with feature j renamed to feature_map[j] (i.e. from sampled to original columns)
+        '''
+        return RuleSet(np.asarray(feature_map, dtype = np.int32)[self.indices], self.offsets.copy(), numFeatures)
+
+    def incidence(self, dtype = np.int32):
+        '''
+        Returns (rules x features) sparse matrix with a one for every feature used by a rule
+        '''
+        if self.numFeatures is None:
+            raise Exception('Number of features needed to build incidence matrix!')
+
+        return sp.csr_matrix((np.ones(len(self.indices), dtype = dtype), self.indices, self.offsets), 
+                             shape = (len(self), self.numFeatures))
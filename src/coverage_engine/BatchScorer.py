@@ -0,0 +1,59 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from RuleSet import RuleSet
+
+class BatchScorer(object):
+    '''
+    Scores data samples against a set of rules in fixed-size row chunks.
+    For each chunk, the number of literals of every rule met by every sample is computed with a 
+    single sparse matrix product, a sample meets a rule if the count equals the rule length.
+    '''
+    
+    def __init__(self, args = {}):
+        self.chunkSize = args['predictChunkSize'] if 'predictChunkSize' in args else 8192
+        self.n_jobs = args['n_jobs'] if 'n_jobs' in args else 1
+    
+    def scoreChunk(self, X, incidence, lengths, binary):
+        '''
+        Returns whether (or how many of) the rules are met by each sample of the chunk
+        '''
+        counts = incidence.dot(np.ascontiguousarray(X.T, dtype = np.int32))
+        K = counts == lengths.reshape(-1,1)
+        
+        return np.any(K, axis = 0) if binary else np.sum(K, axis = 0)
+    
+    def score(self, X, rules, binary = True):
+        '''
+        Function to compute predictions (binary = True) or number of rules met (binary = False)
+        '''
+        rules = RuleSet.asRuleSet(rules, X.shape[1])
+        incidence = rules.incidence()
+        lengths = rules.lengths()
+        
+        #Preallocate output and split samples into chunks
+        numSamples = X.shape[0]
+        output = np.zeros(numSamples, dtype = np.bool_ if binary else np.int64)
+        chunks = [(start, min(start + self.chunkSize, numSamples)) for start in range(0, numSamples, self.chunkSize)]
+        
+        def scoreInto(chunk):
+            start, stop = chunk
+            output[start:stop] = self.scoreChunk(X[start:stop], incidence, lengths, binary)
+        
+        if self.n_jobs > 1 and len(chunks) >= self.n_jobs:
+            with ThreadPoolExecutor(max_workers = self.n_jobs) as pool:
+                list(pool.map(scoreInto, chunks))
+        elif self.n_jobs > 1 and len(rules) > 1:
+            #Too few chunks to keep the threads busy, split the rules of each chunk instead
+            bounds = np.linspace(0, len(rules), min(self.n_jobs, len(rules)) + 1).astype(np.int64)
+            with ThreadPoolExecutor(max_workers = self.n_jobs) as pool:
+                for start, stop in chunks:
+                    X_chunk = X[start:stop]
+                    parts = pool.map(lambda b: self.scoreChunk(X_chunk, incidence[b[0]:b[1]], lengths[b[0]:b[1]], binary),
+                                     zip(bounds[:-1], bounds[1:]))
+                    for part in parts:
+                        output[start:stop] = (output[start:stop] | part) if binary else (output[start:stop] + part)
+        else:
+            for chunk in chunks:
+                scoreInto(chunk)
+        
+        return output
@@ -0,0 +1,80 @@
+import numpy as np
+from .CoverageEngine import CoverageEngine
+from .CoverageCache import CoverageCache
+from DataSource import DataSource
+
+#Number of set bits in every possible byte (used when np.bitwise_count is not available)
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype = np.uint8)
+
+class BitsetCoverage(CoverageEngine):
+    '''
+    Coverage engine that packs every feature column of the data into uint64 bitsets.
+    The coverage of a rule is the word-wise AND of the bitsets of its features.
+    '''
+    
+    def __init__(self, data, Y, args = {}):
+        super().__init__(data, Y, args)
+        self.numSamples = data.shape[0]
+        
+        #Pack each column of X (one bit per sample) and the mask of Z samples
+        self.bits = self.packColumns(data)
+        self.zMask = self.packColumns(DataSource(~Y.reshape(-1,1)))[0]
+        self.allSamples = self.packColumns(DataSource(np.ones((self.numSamples, 1), dtype = np.bool_)))[0]
+        
+        #Cache of rule coverage (shared with pricing when it uses the full data)
+        cacheSize = args['coverageCacheSize'] if 'coverageCacheSize' in args else 4096
+        self.cache = CoverageCache(self.column, self.allSamples, 
+                                   toBool = lambda words: self.unpack(words.reshape(1,-1))[0],
+                                   maxEntries = cacheSize)
+    
+    def packColumns(self, data):
+        '''
+        Packs the columns of a (samples x features) DataSource into a (features x words) uint64 matrix
+        - Rows are packed one chunk at a time (chunks hold a multiple of 64 rows)
+        '''
+        num_bytes = 8*int(np.ceil(data.shape[0]/64))
+        words = np.zeros((data.shape[1], num_bytes), dtype = np.uint8)
+        
+        for start, stop, X in data.chunks():
+            packed = np.packbits(X != 0, axis = 0, bitorder = 'little')
+            words[:, start//8:start//8 + packed.shape[0]] = packed.T
+        
+        return words.view(np.uint64)
+    
+    def column(self, j):
+        '''
+        Returns the bitset of feature j
+        '''
+        return self.bits[j]
+    
+    def unpack(self, words):
+        '''
+        Converts a (rules x words) matrix of bitsets to a (rules x samples) boolean matrix
+        '''
+        return np.unpackbits(words.view(np.uint8), axis = 1, count = self.numSamples, 
+                             bitorder = 'little').astype(np.bool_)
+    
+    def popcount(self, words):
+        '''
+        Counts the number of set bits in each row of a (rules x words) matrix of bitsets
+        '''
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(words).sum(axis = 1, dtype = np.int64)
+        return POPCOUNT_TABLE[words.view(np.uint8)].sum(axis = 1, dtype = np.int64)
+    
+    def computeK(self, feature_sets, K_p = None, K_z = None):
+        '''
+        Computes coverage with bitset ANDs, K_z_coeff comes from popcount of the Z samples covered
+        '''
+        K_p, K_z = self.allocateK(len(feature_sets), K_p, K_z)
+        words = np.array([self.cache.get(features) for features in feature_sets])
+        
+        #Unpack bitsets into the K_p/K_z columns of each batch of rules
+        def fill(start, stop):
+            K = self.unpack(words[start:stop])
+            K_p[:, start:stop] = K[:,self.Y].T
+            K_z[:, start:stop] = K[:,~self.Y].T
+        
+        self.runInBatches(fill, len(feature_sets))
+        
+        return K_p, self.popcount(words & self.zMask), K_z
@@ -0,0 +1,79 @@
+import numpy as np
+from collections import OrderedDict
+
+class CoverageCache(object):
+    '''
+    Bounded LRU cache of rule coverage, keyed by the (sorted) tuple of features in the rule.
+    - The coverage of a rule that is not cached is derived from a cached parent (the rule minus one
+      feature) AND one column, parents missing from the cache are computed (and cached) recursively
+    - Coverage is stored in the representation of the columns (i.e. bool vectors or packed bitsets),
+      toBool converts it to a boolean vector over the samples
+    '''
+
+    def __init__(self, column, allSamples, toBool = None, maxEntries = 4096):
+        self.column = column
+        self.allSamples = allSamples
+        self.toBool = toBool if toBool is not None else (lambda coverage: coverage)
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+
+        #Counters
+        self.hits = 0
+        self.misses = 0
+        self.derived = 0
+
+    def get(self, features):
+        '''
+        Returns coverage of the rule using the given features
+        '''
+        key = tuple(sorted(set(int(f) for f in features)))
+        return self.lookup(key)
+
+    def covered(self, features):
+        '''
+        Returns boolean vector of the samples that meet the rule using the given features
+        '''
+        return self.toBool(self.get(features))
+
+    def lookup(self, key):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        if len(key) == 0:
+            return self.allSamples
+
+        #Derive coverage from a cached parent if possible, otherwise from the prefix of the rule
+        coverage = None
+        if len(key) == 1:
+            coverage = self.allSamples & self.column(key[0])
+        else:
+            for i in range(len(key)-1, -1, -1):
+                parent = key[:i] + key[i+1:]
+                if parent in self.entries:
+                    self.derived += 1
+                    self.entries.move_to_end(parent)
+                    coverage = self.entries[parent] & self.column(key[i])
+                    break
+        if coverage is None:
+            coverage = self.lookup(key[:-1]) & self.column(key[-1])
+
+        coverage.flags.writeable = False
+        self.entries[key] = coverage
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last = False)
+
+        return coverage
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits/lookups if lookups > 0 else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'derived': self.derived,
+                'hitRate': self.hitRate(), 'entries': len(self.entries)}
+
+    def clear(self):
+        self.entries = OrderedDict()
@@ -0,0 +1,52 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+class CoverageEngine(object):
+    '''
+    Parent class to determine which data samples are covered by (i.e. meet) a set of rules.
+    To add a new type of CoverageEngine:
+        - Create a new child class
+        - Specify how to compute the coverage of a batch of rules (computeK)
+    '''
+    
+    def __init__(self, data, Y, args = {}):
+        '''
+        - data is a DataSource over the training data (read in row chunks)
+        '''
+        self.Y = Y
+        self.n_jobs = args['n_jobs'] if 'n_jobs' in args else 1
+        
+        #Coverage cache (None if the engine does not keep one)
+        self.cache = None
+        
+    def computeK(self, feature_sets, K_p = None, K_z = None):
+        '''
+        Takes a list of rules (as arrays of feature indices) and returns K_p, K_z_coeff and K_z
+        - If K_p/K_z are supplied, coverage is written into them (one column per rule)
+        - Needs to be specified in the child class
+        '''
+        pass
+    
+    def allocateK(self, numRules, K_p = None, K_z = None):
+        '''
+        Returns output K_p and K_z matrices (allocated if not supplied)
+        '''
+        K_p = np.zeros((int(np.sum(self.Y)), numRules), dtype = np.bool_) if K_p is None else K_p
+        K_z = np.zeros((int(np.sum(~self.Y)), numRules), dtype = np.bool_) if K_z is None else K_z
+        return K_p, K_z
+    
+    def runInBatches(self, function, numRules):
+        '''
+        Splits rules into contiguous batches and calls function(start, stop) on each batch,
+        batches run on a pool of n_jobs threads (NumPy releases the GIL) and write disjoint columns
+        '''
+        numBatches = max(1, min(self.n_jobs, numRules))
+        bounds = np.linspace(0, numRules, numBatches + 1).astype(np.int64)
+        batches = list(zip(bounds[:-1], bounds[1:]))
+        
+        if numBatches > 1:
+            with ThreadPoolExecutor(max_workers = numBatches) as pool:
+                list(pool.map(lambda batch: function(*batch), batches))
+        else:
+            for start, stop in batches:
+                function(start, stop)
@@ -0,0 +1,32 @@
+import numpy as np
+from .CoverageEngine import CoverageEngine
+
+class DenseCoverage(CoverageEngine):
+    '''
+    Coverage engine that works directly on the (dense) data matrix
+    '''
+    
+    def __init__(self, data, Y, args = {}):
+        super().__init__(data, Y, args)
+        self.data = data
+    
+    def computeK(self, feature_sets, K_p = None, K_z = None):
+        '''
+        Data points meet a rule if all features in the rule have value True (computed by row chunk)
+        '''
+        K_p, K_z = self.allocateK(len(feature_sets), K_p, K_z)
+        
+        for start, stop, X in self.data.chunks():
+            #Break down chunk by sets P and Z
+            X_p = X[self.Y[start:stop]]
+            X_z = X[~self.Y[start:stop]]
+            p_start, z_start = np.sum(self.Y[:start]), np.sum(~self.Y[:start])
+            
+            def fill(rule_start, rule_stop):
+                for i in range(rule_start, rule_stop):
+                    K_p[p_start:p_start+len(X_p), i] = np.all(X_p[:,feature_sets[i]], axis=1)
+                    K_z[z_start:z_start+len(X_z), i] = np.all(X_z[:,feature_sets[i]], axis=1)
+            
+            self.runInBatches(fill, len(feature_sets))
+        
+        return K_p, np.sum(K_z, axis = 0), K_z
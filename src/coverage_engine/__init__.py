@@ -0,0 +1 @@
+__all__ = ['CoverageEngine', 'DenseCoverage', 'BitsetCoverage', 'BatchScorer', 'CoverageCache']
\ No newline at end of file
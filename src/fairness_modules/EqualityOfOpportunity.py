@@ -42,13 +42,24 @@ class EqualityOfOpportunity(FairnessModule):
         if 'lam' not in args or 'mu' not in args or 'fairDuals' not in args or 'row_samples' not in args:
             raise Exception('Required arguments not supplied for NoFair Objective Computation.')
         
-        classPos = np.all(X[:,features],axis=1)
+        classPos = self.getCoverage(X, features, args)
         g = self.group[args['row_samples']]
 
         return args['lam']*(1+len(features)) + np.dot(classPos[Y],np.array(args['coeff'])) + sum(classPos[~Y])
 
     
 
+    def computeSampleWeights(self, Y, args):
+        '''
+        Returns the weight of each sample in the reduced cost (see FairnessModule)
+        '''
+        if 'lam' not in args or 'mu' not in args or 'fairDuals' not in args or 'row_samples' not in args:
+            raise Exception('Required arguments not supplied for NoFair Objective Computation.')
+        
+        weights = np.ones(len(Y))
+        weights[Y] = args['coeff']
+        return weights
+
     def createFairnessConstraint(self, model, x, Y):
         '''
         Returns constraint for fairness
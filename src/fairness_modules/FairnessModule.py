@@ -1,4 +1,5 @@
 import numpy as np
+from RuleSet import RuleSet
 
 class FairnessModule(object):
     '''
@@ -24,14 +25,31 @@ class FairnessModule(object):
         '''
         pass  
     
+    def computeSampleWeights(self, Y, args):
+        '''
+        Returns the weight of each sample in the reduced cost of a rule, i.e.
+        reduced cost = lam*(1+len(features)) + weights . coverage
+        - None if the reduced cost is not linear in the coverage (rules are then priced one at a time)
+        '''
+        return None
+    
+    def getCoverage(self, X, features, args):
+        '''
+        Returns which samples meet the rule, uses the coverage cache in args if one is supplied
+        '''
+        if 'coverageCache' in args and args['coverageCache'] is not None:
+            return args['coverageCache'].covered(features)
+        
+        return np.all(X[:,features],axis=1)
+    
     def computeReducedCosts(self, X, Y, rules, args):
         '''
         Returns reduced costs for all rules
         '''
         reduced_costs = []
         
-        for rule in rules:
-            reduced_costs.append(self.computeObjective(X, Y, np.nonzero(rule)[0], args))
+        for features in RuleSet.asRuleSet(rules, X.shape[1]):
+            reduced_costs.append(self.computeObjective(X, Y, features, args))
         
         return np.array(reduced_costs)
     
@@ -43,6 +61,19 @@ class FairnessModule(object):
         
         return
 
+    def extractDuals(self, model, constraints):
+        '''
+        Stores dual variables of all fairness constraints (as returned by createFairnessConstraint)
+        using a single getAttr call
+        '''
+        if not constraints:
+            return
+        
+        constraints = list(constraints.values()) if isinstance(constraints, dict) else list(constraints)
+        self.fairDuals.update(zip(model.getAttr('ConstrName', constraints), model.getAttr('Pi', constraints)))
+        
+        return
+
     def createFairnessConstraint(self, model, x, Y):
         '''
         Returns constraint for fairness
@@ -51,7 +51,7 @@ class HammingDisparity(FairnessModule):
         if 'ubFair' not in args['fairDuals'] or 'lbFair' not in args['fairDuals']:
             raise Exception('Required fairness dual variables not supplied for NoFair Objective Computation.')
         
-        classPos = np.all(X[:,features],axis=1)
+        classPos = self.getCoverage(X, features, args)
         g = self.group[args['row_samples']]
         coeff_1 = 1+ (args['fairDuals']['ubFair'] - args['fairDuals']['lbFair'])/sum(g)
         coeff_2 = 1+ (args['fairDuals']['lbFair'] - args['fairDuals']['ubFair'])/sum(~g)
@@ -61,6 +61,23 @@ class HammingDisparity(FairnessModule):
 
     
     
+    def computeSampleWeights(self, Y, args):
+        '''
+        Returns the weight of each sample in the reduced cost (see FairnessModule)
+        '''
+        if 'lam' not in args or 'mu' not in args or 'fairDuals' not in args or 'row_samples' not in args:
+            raise Exception('Required arguments not supplied for NoFair Objective Computation.')
+        
+        if 'ubFair' not in args['fairDuals'] or 'lbFair' not in args['fairDuals']:
+            raise Exception('Required fairness dual variables not supplied for NoFair Objective Computation.')
+        
+        g = self.group[args['row_samples']]
+        weights = np.zeros(len(Y))
+        weights[Y] = -np.array(args['mu'])
+        weights[~Y & g] = 1+ (args['fairDuals']['ubFair'] - args['fairDuals']['lbFair'])/sum(g)
+        weights[~Y & ~g] = 1+ (args['fairDuals']['lbFair'] - args['fairDuals']['ubFair'])/sum(~g)
+        return weights
+    
     def updateFairnessConstraint(self, column, constraints, args):
         column.addTerms(1/sum(self.group)*sum(args['K_z'][self.group[~args['Y']]]) - \
                         1/sum(~self.group)*sum(args['K_z'][~self.group[~args['Y']]]), 
@@ -53,7 +53,7 @@ class HammingEqualizedOdds(FairnessModule):
             print(args['fairDuals'])
             raise Exception('Required fairness dual variables not supplied for NoFair Objective Computation.')
         
-        classPos = np.all(X[:,features],axis=1)
+        classPos = self.getCoverage(X, features, args)
         g = self.group[args['row_samples']]
         coeff_1 = 1 + (args['fairDuals']['negUbFair'] - args['fairDuals']['negLbFair'])/sum(g & ~Y)
         coeff_2 = 1 + (args['fairDuals']['negLbFair'] - args['fairDuals']['negUbFair'])/sum(~g & ~Y)
@@ -65,6 +65,23 @@ class HammingEqualizedOdds(FairnessModule):
 
     
     
+    def computeSampleWeights(self, Y, args):
+        '''
+        Returns the weight of each sample in the reduced cost (see FairnessModule)
+        '''
+        if 'lam' not in args or 'mu' not in args or 'fairDuals' not in args or 'row_samples' not in args:
+            raise Exception('Required arguments not supplied for NoFair Objective Computation.')
+        
+        if 'negUbFair' not in args['fairDuals'] or 'negLbFair' not in args['fairDuals']:
+            raise Exception('Required fairness dual variables not supplied for NoFair Objective Computation.')
+        
+        g = self.group[args['row_samples']]
+        weights = np.ones(len(Y))
+        weights[Y] = args['coeff']
+        weights[g & ~Y] += 1 + (args['fairDuals']['negUbFair'] - args['fairDuals']['negLbFair'])/sum(g & ~Y)
+        weights[~g & ~Y] += 1 + (args['fairDuals']['negLbFair'] - args['fairDuals']['negUbFair'])/sum(~g & ~Y)
+        return weights
+    
     def updateFairnessConstraint(self, column, constraints, args):
         column.addTerms(args['KZ_G1'][args['rule']] - args['KZ_G2'][args['rule']],  constraints['negUbFair'])
         column.addTerms(-args['KZ_G1'][args['rule']] + args['KZ_G2'][args['rule']], constraints['negLbFair'])
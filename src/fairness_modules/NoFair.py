@@ -28,11 +28,22 @@ class NoFair(FairnessModule):
         if 'lam' not in args or 'mu' not in args:
             raise Exception('Required arguments not supplied for NoFair Objective Computation.')
 
-        classPos = np.all(X[:,features],axis=1)
+        classPos = self.getCoverage(X, features, args)
         return args['lam']*(1+len(features)) + np.dot(classPos[Y],np.array(args['coeff'])) \
                                                       + sum(classPos[~Y])
 
     
+    def computeSampleWeights(self, Y, args):
+        '''
+        Returns the weight of each sample in the reduced cost (see FairnessModule)
+        '''
+        if 'lam' not in args or 'mu' not in args:
+            raise Exception('Required arguments not supplied for NoFair Objective Computation.')
+        
+        weights = np.ones(len(Y))
+        weights[Y] = args['coeff']
+        return weights
+    
     def extractDualVariables(self):
         '''
         Returns dict with dual variables related to fairness constraint
@@ -0,0 +1,43 @@
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as gp
+
+class ColumnBuilder(object):
+    '''
+    Builds the gurobi columns of a batch of new rules from their coefficient matrices.
+    - Coverage matrices (samples x rules) are converted to CSC once, so each column only gets terms
+      for the constraints of samples the rule covers (no explicit zeros)
+    - gurobipy has no bulk column API, so columns are still added one variable at a time
+    '''
+
+    def __init__(self, numRules):
+        self.numRules = numRules
+        self.blocks = []
+
+    def addBlock(self, K, constrs, scale = 1):
+        '''
+        Adds scale*K[j,i] to constraint constrs[j] for every covered sample j of rule i
+        '''
+        K = sp.csc_matrix(np.asarray(K).reshape(len(constrs), self.numRules))
+        constrArray = np.empty(len(constrs), dtype = object)
+        constrArray[:] = constrs
+        self.blocks.append((K.indptr, K.indices, scale*K.data.astype(np.float64), constrArray))
+
+    def addRow(self, coeffs, constr):
+        '''
+        Adds coeffs[i] to a single constraint (i.e. the complexity constraint) for every rule i
+        '''
+        coeffs = np.broadcast_to(np.asarray(coeffs, dtype = np.float64), (self.numRules,))
+        self.blocks.append((np.arange(self.numRules+1), np.zeros(self.numRules, dtype = np.int64),
+                            coeffs, np.array([constr], dtype = object)))
+
+    def column(self, i):
+        '''
+        Returns the column of rule i
+        '''
+        coeffs, constrs = [], []
+        for indptr, rows, data, constrArray in self.blocks:
+            coeffs.extend(data[indptr[i]:indptr[i+1]].tolist())
+            constrs.extend(constrArray[rows[indptr[i]:indptr[i+1]]].tolist())
+
+        return gp.Column(coeffs, constrs)
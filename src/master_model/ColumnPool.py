@@ -0,0 +1,197 @@
+import numpy as np
+import scipy.sparse as sp
+from RuleSet import RuleSet
+
+class ColumnPool(object):
+    '''
+    Column management for a restricted master LP.
+    - After every LP solve the age of each rule column is updated, a column ages while it is
+      non-basic (at zero) with a positive reduced cost and is reset to zero otherwise
+    - Columns older than maxAge (args['columnMaxAge'], None disables purging) are removed from the
+      master and rule model and parked in an inactive pool (rule, objective, sparse column and coverage),
+      each rule is pooled at most once
+    - Pooled columns are re-priced with the current duals (obj - A^T pi) and re-inserted when
+      their reduced cost is negative
+    - Re-inserted columns (and pooled rules that pricing generates again, see addRule) reuse the 
+      pooled coverage instead of recomputing it
+    '''
+
+    def __init__(self, master, args = {}):
+        self.master = master
+        self.maxAge = args['columnMaxAge'] if 'columnMaxAge' in args else None
+        self.tol = args['columnPoolTol'] if 'columnPoolTol' in args else 1e-9
+        self.ages = np.zeros(0, dtype = np.int64)
+
+        #Inactive columns
+        self.rules = None
+        self.obj = np.zeros(0)
+        self.A = None
+        self.K_p = None
+        self.K_z = None
+        self.index = {}
+
+        #Counters
+        self.evicted = 0
+        self.reinserted = 0
+
+    def __len__(self):
+        return 0 if self.rules is None else len(self.rules)
+
+    def resetAges(self):
+        '''
+        Forgets the ages of the active columns (i.e. when the master model is rebuilt)
+        '''
+        self.ages = np.zeros(0, dtype = np.int64)
+
+    def update(self):
+        '''
+        Ages the rule columns of the last LP solve and evicts the stale ones
+        '''
+        if self.maxAge is None:
+            return 0
+
+        model = self.master.model
+        wStart = self.master.wStart
+        x = np.array(model.getAttr('X'))[wStart:]
+        rc = np.array(model.getAttr('RC'))[wStart:]
+
+        #New columns start with age zero
+        ages = np.zeros(len(x), dtype = np.int64)
+        ages[:min(len(self.ages), len(x))] = self.ages[:len(x)]
+        self.ages = np.where((x <= self.tol) & (rc > self.tol), ages + 1, 0)
+
+        evict = np.nonzero(self.ages >= self.maxAge)[0]
+        if len(evict) == 0:
+            return 0
+
+        #Park evicted columns (copies, the rule model stores are compacted by the removal)
+        keys = list(self.master.w.keys())
+        wVars = [self.master.w[keys[i]] for i in evict]
+        obj = np.array(model.getAttr('Obj', wVars))
+        A = self.getColumns(wVars)
+        ruleModel = self.master.ruleModel
+        rules = ruleModel.rules[evict]
+        K_p, K_z = ruleModel.K_p[:, evict], ruleModel.K_z[:, evict]
+        self.master.removeColumns(evict)
+        self.ages = np.delete(self.ages, evict)
+        self.add(rules, obj, A, K_p, K_z)
+        self.evicted += len(evict)
+
+        return len(evict)
+
+    def getColumns(self, wVars):
+        '''
+        Sparse (csc) columns of the given variables, restricted to the rows of the constraints 
+        shared by all columns
+        '''
+        numBaseConstrs = self.master.numBaseConstrs
+        rows, values, pointers = [], [], [0]
+        for var in wVars:
+            column = self.master.model.getCol(var)
+            for k in range(column.size()):
+                row = column.getConstr(k).index
+                if row < numBaseConstrs:
+                    rows.append(row)
+                    values.append(column.getCoeff(k))
+            pointers.append(len(rows))
+
+        return sp.csc_matrix((values, rows, pointers), shape = (numBaseConstrs, len(wVars)))
+
+    def add(self, rules, obj, A, K_p, K_z):
+        #Skip rules that are already pooled (or repeated in the evicted set)
+        isNew = np.zeros(len(rules), dtype = np.bool_)
+        for i, key in enumerate(self.master.ruleModel.ruleKeys(rules)):
+            if key not in self.index:
+                self.index[key] = len(self) + int(np.sum(isNew))
+                isNew[i] = True
+        if not np.all(isNew):
+            rules, obj, A, K_p, K_z = rules[isNew], obj[isNew], A[:, isNew], K_p[:, isNew], K_z[:, isNew]
+        if len(rules) == 0:
+            return
+
+        if self.rules is None:
+            self.rules, self.obj, self.A, self.K_p, self.K_z = rules, obj, A, K_p, K_z
+        else:
+            self.rules = RuleSet(np.concatenate([self.rules.indices, rules.indices]),
+                                 np.concatenate([self.rules.offsets, rules.offsets[1:] + self.rules.offsets[-1]]),
+                                 self.rules.numFeatures)
+            self.obj = np.concatenate([self.obj, obj])
+            self.A = sp.hstack([self.A, A], format = 'csc')
+            self.K_p = np.hstack([self.K_p, K_p])
+            self.K_z = np.hstack([self.K_z, K_z])
+
+    def reducedCosts(self):
+        '''
+        Reduced costs of the pooled columns with the duals of the last LP solve
+        '''
+        pi = np.array(self.master.model.getAttr('Pi'))[:self.master.numBaseConstrs]
+        return self.obj - self.A.T.dot(pi)
+
+    def take(self, selected):
+        '''
+        Removes the selected pooled columns and returns their rules and coverage (K_p, K_z)
+        '''
+        taken = (self.rules[selected], (self.K_p[:, selected], self.K_z[:, selected]))
+        keep = np.ones(len(self), dtype = np.bool_)
+        keep[selected] = False
+        self.rules, self.obj, self.A = self.rules[keep], self.obj[keep], self.A[:, keep]
+        self.K_p, self.K_z = self.K_p[:, keep], self.K_z[:, keep]
+        if len(self.rules) == 0:
+            self.rules, self.obj, self.A, self.K_p, self.K_z = None, np.zeros(0), None, None, None
+        self.index = {} if self.rules is None else dict(zip(self.master.ruleModel.ruleKeys(self.rules), 
+                                                            range(len(self.rules))))
+
+        return taken
+
+    def reinsert(self):
+        '''
+        Re-inserts pooled columns with negative reduced cost into the master, returns number re-inserted
+        '''
+        if len(self) == 0:
+            return 0
+
+        selected = np.nonzero(self.reducedCosts() < -self.tol)[0]
+        if len(selected) == 0:
+            return 0
+
+        return self.insert(*self.take(selected))
+
+    def restore(self):
+        '''
+        Moves all pooled columns back into the master (i.e. before solving the final integer model)
+        '''
+        if len(self) == 0:
+            return 0
+
+        return self.insert(*self.take(np.arange(len(self))))
+
+    def addRule(self, rules):
+        '''
+        Adds priced rules to the master, rules that are parked in the pool are moved back with their
+        pooled coverage instead of recomputing it
+        '''
+        if len(self) > 0:
+            rules = RuleSet.asRuleSet(rules, self.rules.numFeatures)
+            positions = [self.index.get(key) for key in self.master.ruleModel.ruleKeys(rules)]
+            pooled = np.array([position is not None for position in positions], dtype = np.bool_)
+            if np.any(pooled):
+                self.insert(*self.take(np.unique([p for p in positions if p is not None])))
+                rules = rules[~pooled]
+                if len(rules) == 0:
+                    return
+
+        self.master.addRule(rules)
+
+    def insert(self, rules, coverage):
+        '''
+        Adds pooled rules back to the master with their coverage, returns number of columns added
+        '''
+        numRules = self.master.ruleModel.numRules()
+        self.master.addRule(rules, coverage)
+        numInserted = self.master.ruleModel.numRules() - numRules
+        self.reinserted += numInserted
+
+        return numInserted
+
+    def stats(self):
+        return {'active': len(self.ages), 'pooled': len(self), 'evicted': self.evicted, 'reinserted': self.reinserted}
@@ -3,6 +3,10 @@ import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 import time
+from .ColumnBuilder import ColumnBuilder
+from .LPModel import LPModel
+from .ColumnPool import ColumnPool
+from .MIPStart import MIPStart
 
 class CompactDoubleSidedMaster(object):
     '''
@@ -15,6 +19,9 @@ class CompactDoubleSidedMaster(object):
         self.fairnessModule = fairnessModule
         self.complexityConstraint = args['ruleComplexity'] if 'ruleComplexity' in args else 40
         self.ip_time_limit = args['IP_time_limit'] if 'IP_time_limit' in args else 300
+        
+        #Upper bound on the sum of the rule variables (every rule has complexity >= 1, used for the Lagrangian bound)
+        self.maxRuleWeight = self.complexityConstraint
         self.w = {}
         self.var_counter = 0
         self.model_count = 0
@@ -24,9 +31,16 @@ class CompactDoubleSidedMaster(object):
         #Initialize Model
         self.setupModelObject()
         self.initModel()
+        
+        #Ages rule columns and parks stale ones in an inactive pool (if args['columnMaxAge'] is set)
+        self.columnPool = ColumnPool(self, args)
+        
+        #Incumbents (rounded LP, greedy cover, previous rule sets) for the final integer solve
+        self.mipStart = MIPStart(self, self.complexityConstraint, args = args)
     
     def setupModelObject(self):
         self.model = gp.Model('masterLP')
+        self.lp = LPModel(self.model)
         
         if self.solver == 'barrier':
             print('Using barrier')
@@ -48,7 +62,7 @@ class CompactDoubleSidedMaster(object):
         #Initialize positive misclassification variables
         self.x = []
         for k in range(sum(self.ruleModel.Y)):
-            self.x.append(self.model.addVar(obj=1, vtype=GRB.BINARY, name="eps[%d]"%k))
+            self.x.append(self.lp.addVar(obj=1, vtype=GRB.BINARY, name="eps[%d]"%k))
 
         #Add positive misclassification constraints
         self.misClassConst = []
@@ -63,6 +77,11 @@ class CompactDoubleSidedMaster(object):
         self.compConst = self.model.addConstr( 0*self.x[0] <= self.complexityConstraint, name = 'compConst')
         
         self.fairnessConstraints = self.fairnessModule.createFairnessConstraint(self.model, self.x, self.ruleModel.Y)
+
+        #Position of the first rule variable (w) in the model
+        self.wStart = len(self.x)
+        self.model.update()
+        self.numBaseConstrs = self.model.NumConstrs
     
     def solve(self, relax = True, verbose = False, saveModel = False):
         '''
@@ -72,16 +91,21 @@ class CompactDoubleSidedMaster(object):
         '''
                 
         #Update model, select version to run and optimize
-        self.model.update()
-        self.finalMod = self.model.relax() if relax else self.model #Can put something else instead of base MIP solver
+        #LP is re-solved in place (warm-started), integer model is a copy of it with integrality restored
+        if relax:
+            self.lp.warmStart()
+        self.finalMod = self.model if relax else self.lp.integerModel()
         
         #Need to un-hard code this later
         if not relax:
             self.finalMod.Params.TimeLimit = self.ip_time_limit
+            self.mipStart.apply(self.finalMod)
             
         self.finalMod.Params.OutputFlag = verbose
         self.finalMod.optimize()
         self.model_count += 1
+        if relax:
+            self.lp.saveSolution()
         
         #if saveModel:
         #    self.finalMod.write('model-'+str(self.model_count)+'.lp')
@@ -101,28 +125,15 @@ class CompactDoubleSidedMaster(object):
         results['ruleSet'] = self.getRuleSet(self.finalMod.getVars())
 
         if relax:
-            mu = []
-            alpha = []
-            lam = None
-            
-            duals = []
-            #Recover Dual Variables if using LP Relaxation
-            for c in self.finalMod.getConstrs():
-                #duals.append([c.ConstrName, c.Pi])
-                if c.ConstrName == 'compConst':
-                    lam = c.Pi
-                elif c.ConstrName in self.fairnessModule.fairConstNames:
-                    self.fairnessModule.extractDualVariables(c)
-                elif "MisclassConstLB" in c.ConstrName:
-                    alpha.append(c.Pi)
-                else:
-                    mu.append(c.Pi)
+            #Recover Dual Variables if using LP Relaxation (one getAttr call per constraint family)
+            mu = np.array(self.finalMod.getAttr('Pi', self.misClassConst))
+            alpha = np.array(self.finalMod.getAttr('Pi', self.misClasConstLB))
+            lam = self.compConst.Pi
+            self.fairnessModule.extractDuals(self.finalMod, self.fairnessConstraints)
             
-            #duals = pd.DataFrame.from_records(duals)
-            #duals.to_csv('duals.csv')
             results['mu'] = mu
             results['alpha'] = alpha
-            results['coeff'] = list(2*np.array(alpha) - np.array(mu))
+            results['coeff'] = 2*alpha - mu
             results['lam'] = lam
             results['fairDuals'] = self.fairnessModule.fairDuals
 
@@ -130,11 +141,15 @@ class CompactDoubleSidedMaster(object):
         return results
     
     def getRC(self):
-        decisionVars = self.finalMod.getVars()
-        return [v.getAttr("RC") for v in decisionVars if 'w' in v.getAttr("VarName")]
+        '''
+        Returns reduced costs of the rule variables (w)
+        '''
+        return np.array(self.finalMod.getAttr('RC'))[self.wStart:]
     
     def resetModel(self, initialRules = None):
         self.setupModelObject()
+        self.w = {}
+        self.columnPool.resetAges()
         print('init model')
         self.initModel()
         print('adding rules')
@@ -144,36 +159,39 @@ class CompactDoubleSidedMaster(object):
         return
         
         
-    def addRule(self, rules): 
+    def addRule(self, rules, coverage = None): 
         '''
         Function to add new rules to the restricted model.
         -Input takes LIST of rule objects
+        -coverage = (K_p, K_z) of the rules (optional, i.e. from a checkpoint) skips computing it
         '''
         
         start_time = time.perf_counter()
 
         #Need to deal with case when added rule not unique
-        K_p, K_z_coeff, c, K_z= self.ruleModel.addRule(rules)
+        K_p, K_z_coeff, c, K_z= self.ruleModel.addRule(rules, coverage)
         
         FCargs = self.fairnessModule.bulkComputeGroupKz(K_z, self.ruleModel.Y)
         
         #print('Rule model adding rules took %.2f seconds'%(time.perf_counter() - start_time))
         start_time = time.perf_counter()
 
+        #Specify new columns (only nonzero coefficients of the coverage matrices)
+        columns = ColumnBuilder(len(c))
+        columns.addBlock(K_p, self.misClassConst)
+        columns.addBlock(K_p, self.misClasConstLB, 2)
+        columns.addRow(c, self.compConst)
+
         #Add new decision variable for each rule
         for i in range(len(c)):
             
-            #Specify new column
-            newCol = gp.Column()
-            newCol.addTerms(K_p[:,i] , self.misClassConst)
-            newCol.addTerms(2*K_p[:,i] , self.misClasConstLB)
-            newCol.addTerms(c[i],  self.compConst)
+            newCol = columns.column(i)
             FCargs['rule'] = i
             
             self.fairnessModule.updateFairnessConstraint(newCol,self.fairnessConstraints,FCargs)
             
             #Add decision variable
-            self.w[self.var_counter] = self.model.addVar(obj=K_z_coeff[i], 
+            self.w[self.var_counter] = self.lp.addVar(obj=K_z_coeff[i], 
                                            vtype=GRB.INTEGER, 
                                            lb = 0.0,
                                            name="w[%d]"%self.var_counter, 
@@ -182,13 +200,27 @@ class CompactDoubleSidedMaster(object):
         #print('Adding columns took %.2f seconds'%(time.perf_counter() - start_time))
 
     
+    def removeColumns(self, positions):
+        '''
+        Removes the rule columns at the given positions (i.e. evicted by the column pool) from the 
+        model and the rule model
+        '''
+        keys = list(self.w.keys())
+        positions = list(positions)
+        
+        self.lp.remove([self.w[keys[i]] for i in positions])
+        self.ruleModel.removeRules(positions)
+        
+        for i in positions:
+            del self.w[keys[i]]
+
     def getRuleSet(self, decisionVars):
         '''
         Given final decision variables, returns the optimal rules as determined by the model
         '''
         
         # For rules generated during relaxed version, incldues all rules where w > 0
-        inclRules = [v.x > 0 for v in decisionVars[len(self.x)::]]
+        inclRules = np.array(self.finalMod.getAttr('X', decisionVars[self.wStart:])) > 0
         
         # Return what we can given the current state of variables
         if len(inclRules) > 0 and self.ruleModel.rules is not None: 
@@ -198,20 +230,27 @@ class CompactDoubleSidedMaster(object):
         
     def getAllSolutions(self):
         '''
-        Return rule with best accuracy
+        Returns the rule sets of all solutions in the pool of the last solve
         '''
         
-        solCount = self.model.SolCount
-        solutions = []
-        objs = []
-        
-        #Loop through stored solutions and keep if negative reduced cost
-        for i in range(solCount):
-            self.model.Params.SolutionNumber = i
-            solutions.append(self.getRuleSetNumpy(self.finalMod.getAttr(GRB.Attr.Xn)))
+        solutions = [self.ruleModel.rules[selected] if len(selected) > 0 else [] for selected in self.getSolutionPool()]
         
         print('Number of solutions returned: ', len(solutions))
         return solutions
+    
+    def getSolutionPool(self):
+        '''
+        Returns a boolean matrix (solutions x rules) of the rules selected by each solution in the pool 
+        of the last solve
+        '''
+        wVars = self.finalMod.getVars()[self.wStart:]
+        pool = np.zeros((self.finalMod.SolCount, len(wVars)), dtype = np.bool_)
+        
+        for i in range(self.finalMod.SolCount):
+            self.finalMod.Params.SolutionNumber = i
+            pool[i] = np.array(self.finalMod.getAttr('Xn', wVars)) > 0.5
+        
+        return pool
 
     def getRuleSetNumpy(self, decisionVars):
         '''
@@ -219,7 +258,7 @@ class CompactDoubleSidedMaster(object):
         '''
         
         # For rules generated during relaxed version, incldues all rules where w > 0
-        inclRules = [v > 0 for v in decisionVars[len(self.x)::]]
+        inclRules = np.array(decisionVars[self.wStart:]) > 0
         
         # Return what we can given the current state of variables
         if len(inclRules) > 0 and self.ruleModel.rules is not None: 
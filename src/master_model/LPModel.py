@@ -0,0 +1,112 @@
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+class LPModel(object):
+    '''
+    Persistent LP relaxation of a restricted master model.
+    - Variables are added as continuous (binary variables get an upper bound of 1), their integrality
+      is recorded and only applied to a copy of the model for the final integer solve
+    - The same LP receives new columns every iteration and is modified in place, so Gurobi warm-starts
+      it from its own basis of the previous solve
+    - The basis of the last solve is saved (i.e. for checkpoints), a saved basis is only loaded into the
+      model after it was restored with setBasis (new variables start nonbasic at their lower bound, 
+      new constraints with a basic slack)
+    '''
+
+    def __init__(self, model):
+        self.model = model
+        self.intVars = []
+        self.intTypes = []
+
+        #Basis and primal solution of the last solve (None if not available, i.e. barrier without crossover)
+        self.vBasis = None
+        self.cBasis = None
+        self.solution = None
+        self.basisRestored = False
+
+    def addVar(self, vtype = GRB.CONTINUOUS, ub = GRB.INFINITY, **kwargs):
+        '''
+        Adds a continuous variable, integrality (vtype) is only applied to the final integer model
+        '''
+        var = self.model.addVar(vtype = GRB.CONTINUOUS, ub = min(ub, 1.0) if vtype == GRB.BINARY else ub, **kwargs)
+        if vtype != GRB.CONTINUOUS:
+            self.intVars.append(var)
+            self.intTypes.append(vtype)
+
+        return var
+
+    def remove(self, variables, constraints = []):
+        '''
+        Removes variables/constraints from the model, the saved basis and the integrality record
+        are compacted accordingly
+        '''
+        self.model.update()
+        varPositions = set(var.index for var in variables)
+        constrPositions = set(constr.index for constr in constraints)
+
+        #The saved basis stays valid only if no basic variable and no nonbasic slack is removed
+        if self.vBasis is not None:
+            if (any(self.vBasis[i] == GRB.BASIC for i in varPositions if i < len(self.vBasis)) or
+                any(self.cBasis[i] != GRB.BASIC for i in constrPositions if i < len(self.cBasis))):
+                self.vBasis, self.cBasis = None, None
+            else:
+                self.vBasis = [b for i, b in enumerate(self.vBasis) if i not in varPositions]
+                self.cBasis = [b for i, b in enumerate(self.cBasis) if i not in constrPositions]
+        if self.solution is not None:
+            self.solution = np.delete(self.solution, [i for i in varPositions if i < len(self.solution)])
+
+        kept = [(var, vtype) for var, vtype in zip(self.intVars, self.intTypes) if var.index not in varPositions]
+        self.intVars = [var for var, vtype in kept]
+        self.intTypes = [vtype for var, vtype in kept]
+
+        self.model.remove(list(variables) + list(constraints))
+        self.model.update()
+
+    def setBasis(self, vBasis, cBasis):
+        '''
+        Restores a saved basis (i.e. from a checkpoint), it is loaded into the model before the next solve
+        '''
+        self.vBasis, self.cBasis = vBasis, cBasis
+        self.basisRestored = True
+
+    def warmStart(self):
+        '''
+        Loads a restored basis (see setBasis), extended to the variables/constraints added since
+        '''
+        self.model.update()
+        if not self.basisRestored or self.vBasis is None:
+            return
+        self.basisRestored = False
+
+        numNewVars = self.model.NumVars - len(self.vBasis)
+        numNewConstrs = self.model.NumConstrs - len(self.cBasis)
+        if numNewVars < 0 or numNewConstrs < 0:
+            return
+
+        self.model.setAttr('VBasis', self.model.getVars(), self.vBasis + [GRB.NONBASIC_LOWER]*numNewVars)
+        self.model.setAttr('CBasis', self.model.getConstrs(), self.cBasis + [GRB.BASIC]*numNewConstrs)
+
+    def saveSolution(self):
+        '''
+        Stores the optimal solution of the LP (used for MIP starts) and its basis (used to warm-start the next solve)
+        '''
+        self.solution = np.array(self.model.getAttr('X', self.model.getVars()))
+        try:
+            self.vBasis = self.model.getAttr('VBasis', self.model.getVars())
+            self.cBasis = self.model.getAttr('CBasis', self.model.getConstrs())
+        except gp.GurobiError:
+            self.vBasis, self.cBasis = None, None
+
+    def integerModel(self):
+        '''
+        Returns a copy of the model with the integrality of the variables restored
+        '''
+        self.model.update()
+        mip = self.model.copy()
+        if len(self.intVars) > 0:
+            mipVars = mip.getVars()
+            mip.setAttr('VType', [mipVars[var.index] for var in self.intVars], self.intTypes)
+            mip.update()
+
+        return mip
@@ -0,0 +1,133 @@
+import numpy as np
+
+class MIPStart(object):
+    '''
+    Incumbent seeding for the final integer solve of a restricted master model.
+    Candidate values of the rule variables (w) are passed to the integer model as MIP starts:
+    - Rounding of the last LP solution (w >= 0.5), dropping the smallest values while over the complexity budget
+    - Greedy set cover over the LP support (rules with w > 0), adding the rule with the best marginal gain
+      (newly covered positives minus objective/complexity cost) while it is positive and fits in the budget
+    - The previously fitted rule set (see setRuleSet), restricted to the rules present in the master
+    The remaining variables are completed by the solver. Disabled with args['mipStart'] = False.
+    '''
+
+    def __init__(self, master, budget = None, complexityWeight = 0, coverNegatives = False, args = {}):
+        self.master = master
+        self.budget = budget
+        self.complexityWeight = complexityWeight
+        #Negatives are charged once when first covered (zero-one loss) instead of through the rule objective
+        self.coverNegatives = coverNegatives
+        self.enabled = args['mipStart'] if 'mipStart' in args else True
+        self.tol = 1e-6
+        self.ruleSet = None
+
+    def setRuleSet(self, rules):
+        '''
+        Stores the rule set of the previous fit to be used as a MIP start (replaces the stored one)
+        '''
+        self.ruleSet = rules if rules is not None and len(rules) > 0 else None
+
+    def rounding(self, w, C):
+        start = (w >= 0.5).astype(np.float64)
+        if self.budget is not None:
+            for i in np.argsort(w):
+                if start @ C <= self.budget:
+                    break
+                start[i] = 0
+
+        return start
+
+    def greedyCover(self, w, C, obj):
+        '''
+        Greedy set cover of the positive samples with the rules in the support of the LP solution
+        '''
+        candidates = np.nonzero(w > self.tol)[0]
+        K_p = self.master.ruleModel.K_p[:, candidates]
+        K_z = self.master.ruleModel.K_z[:, candidates]
+        cost = obj + self.complexityWeight*C
+        covered = np.zeros(K_p.shape[0], dtype = np.bool_)
+        coveredNeg = np.zeros(K_z.shape[0], dtype = np.bool_)
+        available = np.ones(len(candidates), dtype = np.bool_)
+        start = np.zeros(len(w))
+        used = 0
+
+        while np.any(available):
+            #Marginal gains of all candidates at once
+            gains = np.sum(K_p & ~covered[:, None], axis = 0) - cost[candidates]
+            if self.coverNegatives:
+                gains -= np.sum(K_z & ~coveredNeg[:, None], axis = 0)
+            gains[~available] = -np.inf
+            if self.budget is not None:
+                gains[used + C[candidates] > self.budget] = -np.inf
+
+            best = np.argmax(gains)
+            if gains[best] <= 0:
+                break
+
+            j = candidates[best]
+            available[best] = False
+            start[j] = 1
+            used += C[j]
+            covered |= K_p[:, best]
+            coveredNeg |= K_z[:, best]
+
+        return start
+
+    def fromRuleSet(self, rules, numRules):
+        start = np.zeros(numRules)
+        ruleIndex = self.master.ruleModel.ruleIndex
+        positions = [ruleIndex[key] for key in self.master.ruleModel.ruleKeys(rules) if key in ruleIndex]
+        start[positions] = 1
+
+        return start
+
+    def build(self):
+        '''
+        Returns the list of candidate starts (values of the rule variables)
+        '''
+        numRules = self.master.ruleModel.numRules()
+        if numRules == 0:
+            return []
+
+        starts = []
+        solution = self.master.lp.solution
+        if solution is not None and len(solution) <= self.master.wStart + numRules:
+            #Columns added after the last LP solve (i.e. restored from the column pool) start at zero
+            w = np.zeros(numRules)
+            w[:len(solution) - self.master.wStart] = solution[self.master.wStart:]
+            C = self.master.ruleModel.C
+            obj = np.array(self.master.model.getAttr('Obj'))[self.master.wStart:]
+            starts.append(self.rounding(w, C))
+            starts.append(self.greedyCover(w, C, obj))
+
+        if self.ruleSet is not None:
+            starts.append(self.fromRuleSet(self.ruleSet, numRules))
+
+        #Drop duplicate starts
+        unique = []
+        for start in starts:
+            if not any(np.array_equal(start, other) for other in unique):
+                unique.append(start)
+
+        return unique
+
+    def apply(self, mip):
+        '''
+        Loads the candidate starts into the (copied) integer model, returns number of starts
+        '''
+        if not self.enabled:
+            return 0
+
+        starts = self.build()
+        if len(starts) == 0:
+            return 0
+
+        wVars = mip.getVars()[self.master.wStart:]
+        mip.NumStart = len(starts)
+        mip.update()
+        for i, start in enumerate(starts):
+            mip.Params.StartNumber = i
+            mip.setAttr('Start', wVars, start.tolist())
+        mip.update()
+
+        return len(starts)
@@ -1,2 +1,3 @@
 __all__ = ['CompactDoubleSidedMaster','CompactOneSidedMaster','RegularizedOneSidedMaster', 
-           'ZeroOneMaster','ZeroOneDoubleSidedMaster','CompactDoubleSidedUBMaster', 'CompactDoubleSidedBinaryMaster']
\ No newline at end of file
+           'ZeroOneMaster','ZeroOneDoubleSidedMaster','CompactDoubleSidedUBMaster', 'CompactDoubleSidedBinaryMaster',
+           'ColumnBuilder', 'LPModel', 'ColumnPool', 'MIPStart']
\ No newline at end of file
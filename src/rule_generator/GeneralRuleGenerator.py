@@ -22,6 +22,7 @@ class GeneralRuleGenerator(object):
         self.args = args
         self.ruleMod = ruleMod
         self.fairnessModule = fairnessModule
+        self.minReducedCost = None
         
         #Extract Rule Generator 
         ruleGenerator = args['ruleGenerator'] if 'ruleGenerator' in args else ruleGenerator
@@ -47,6 +48,7 @@ class GeneralRuleGenerator(object):
         #Init variables
         final_rules = []
         sampling = True
+        self.minReducedCost = None
         
         #Set-up timing if needed
         if 'timeLimit' in args:
@@ -60,14 +62,23 @@ class GeneralRuleGenerator(object):
         while (len(final_rules) == 0) and (sampling):
         
             #Sample Datasets
-            X, Y, args['coeff'], args['row_samples'], col_samples = self.sampler.getSample(self.ruleMod.X, 
+            X, Y, args['coeff'], args['row_samples'], col_samples = self.sampler.getSample(self.ruleMod.data, 
                                                                                                        self.ruleMod.Y, 
                                                                                                        args['coeff'])
+            args['col_samples'] = col_samples
+            
             #If we return everything, we're not subsampling
             sampling = not (len(Y) == len(self.ruleMod.Y))
             
+            #On the full data, pricing shares the rule model's coverage cache
+            fullData = not sampling and np.all(col_samples)
+            args['coverageCache'] = self.ruleMod.coverage.cache if fullData else None
+            
             #Generate Rules
             rules, rcs = self.ruleGen.generateRule(X, Y, args)
+            
+            #Bound on the reduced cost is only valid when (exact) pricing saw all rows and columns
+            self.minReducedCost = self.ruleGen.minReducedCost if fullData else None
 
             #Subsample rules to return
             final_rules, final_rcs = self.ruleSelect.getRules(rules, rcs, col_samples)
@@ -96,6 +107,36 @@ class GeneralRuleGenerator(object):
         else:
             raise Exception('No associated rule model found.')
     
+    def computeReducedCosts(self, rules, args):
+        '''
+        Returns the reduced costs of the given rules on the full data with the given duals 
+        (i.e. to check rules priced with smoothed duals against the true duals)
+        '''
+        args = dict(args)
+        args['row_samples'] = np.ones(len(self.ruleMod.Y), dtype = np.bool_)
+        args['coverageCache'] = self.ruleMod.coverage.cache
+        X = self.ruleMod.data if args['coverageCache'] is not None else self.ruleMod.data.toArray()
+        
+        return self.fairnessModule.computeReducedCosts(X, self.ruleMod.Y, rules, args)
+    
+    def stats(self):
+        '''
+        Returns search counters of the rule generator
+        '''
+        return self.ruleGen.stats()
+    
+    def resetStats(self):
+        '''
+        Resets the search counters of the rule generator
+        '''
+        self.ruleGen.resetStats()
+    
+    def close(self):
+        '''
+        Releases resources of the rule generator (i.e. pricing processes)
+        '''
+        self.ruleGen.close()
+    
     def initRuleGenerator(self, ruleGenerator):
         '''
         Function that maps string rule generators to objects
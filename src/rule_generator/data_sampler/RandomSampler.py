@@ -16,19 +16,21 @@ class RandomSampler(SubSampler):
     
     def getSample(self, X, Y, coeff, args = {}):
        
-        X_sample = X
         Y_sample = Y
         coeff_sample = np.array(coeff)
+        row_samples = np.ones(X.shape[0], dtype = np.bool_)
         col_samples = np.ones(X.shape[1]).astype(np.bool)
         
         if self.rowSample:
             perc = min(self.samplePercRow/X.shape[0],1)
             row_samples = bernoulli.rvs(perc, size=X.shape[0]).astype(np.bool)
-            X_sample = X_sample[row_samples, :]
+            X_sample = X.takeRows(row_samples)
             Y_sample = Y_sample[row_samples]
             coeff_sample = coeff_sample[row_samples[Y]]
+        else:
+            X_sample = X.toArray()
         if self.columnSample:
-            col_perc = min(self.samplePercCol/np.mean(np.sum(X_sample > 0, axis=0))/X_shape.shape[1],1)
+            col_perc = min(self.samplePercCol/np.mean(np.sum(X_sample > 0, axis=0))/X_sample.shape[1],1)
             col_samples = bernoulli.rvs(col_perc, size=X.shape[1]).astype(np.bool)
             X_sample = X_sample[:, col_samples]
         
@@ -8,7 +8,7 @@ class SubSampler(object):
         
     def getSample(self, X, Y, coeff, args = {}):
         '''
-        Takes data and returns a (sub)set of it
+        Takes data (DataSource) and returns a (sub)set of it
         '''
         pass            
 
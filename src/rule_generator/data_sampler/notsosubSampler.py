@@ -10,4 +10,4 @@ class NotSoSubSampler(SubSampler):
         '''
         Returns all the data (note last two returned variables indicate which rows/cols are included)
         '''
-        return X, Y, coeff, np.ones(X.shape[0]).astype(np.bool),  np.ones(X.shape[1]).astype(np.bool)      
+        return X.toArray(), Y, coeff, np.ones(X.shape[0], dtype = np.bool_), np.ones(X.shape[1], dtype = np.bool_)      
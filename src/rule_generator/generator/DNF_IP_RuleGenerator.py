@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
 import gurobipy as gp
+import scipy.sparse as sp
 from gurobipy import GRB
 from .RuleGenerator import RuleGenerator
+from RuleSet import RuleSet
 
 class DNF_IP_RuleGenerator(RuleGenerator):
     '''
     Implementation of IP Pricing Problem Solver
+    - The model is built once per data sample and cached, later calls only update the objective (duals)
+      and are seeded with the rules of the previous solution pool
     '''
     
     def __init__(self, fairnessModule, args = {}):
@@ -14,6 +18,11 @@ class DNF_IP_RuleGenerator(RuleGenerator):
         #Set rule complexity if supplied in arguments
         self.fairnessModule = fairnessModule
         self.ruleComplex = args['ruleComplexity'] if 'ruleComplexity' in args else 100
+        
+        #Identity of the data sample the cached model was built for, and the rules of its last solution pool
+        self.sampleKey = None
+        self.cachedY = None
+        self.startSolutions = []
 
 
     def initModel(self, X, Y):
@@ -24,37 +33,33 @@ class DNF_IP_RuleGenerator(RuleGenerator):
         numSamples, numFeatures = X.shape
         D = self.ruleComplex
         
-        #Construct decision variables for new rule 
-        self.z = []
-        for k in range(numFeatures):
-            self.z.append(self.model.addVar(vtype=GRB.BINARY, name="z[%d]"%k))
-
-        #Construct decision variables for misclassification
-        self.delta = []
-        for i in range(numSamples):
-            self.delta.append(self.model.addVar(vtype=GRB.BINARY, name= "delta[%d]"%i))
+        #Construct decision variables for new rule and for misclassification (kept as lists of variables)
+        self.z = self.model.addMVar(numFeatures, vtype=GRB.BINARY, name="z").tolist()
+        self.delta = self.model.addMVar(numSamples, vtype=GRB.BINARY, name="delta").tolist()
         
         #Add complexity constraint
         self.complexConst = self.model.addConstr(gp.LinExpr(np.ones(numFeatures), self.z) <= self.ruleComplex,
                                                  name="ComplexityConst")
-        #Add misclassification constraints
-        for i in range(numSamples):
-            #Constraint for data samples where Y = False
-            if not Y[i]:
-                self.model.addConstr(gp.LinExpr(~X[i,:]*1, self.z) + self.delta[i] >= 1,
-                                      name="sampleConstraint[%d]"%i)
-            #Constraints for data samples where Y = True
-            else:
-                self.model.addConstr(gp.LinExpr(~X[i,:]*1, self.z) + D*self.delta[i] <= D,
-                                      name="sampleConstraint[%d]"%i)
+        #Add misclassification constraints (one sparse matrix over [z, delta], row i is sample i)
+        # - Y = False: sum of unmet features + delta >= 1
+        # - Y = True: sum of unmet features + D*delta <= D
+        Y = np.asarray(Y, dtype = np.bool_)
+        A = sp.hstack([sp.csr_matrix(~np.asarray(X, dtype = np.bool_), dtype = np.float64), 
+                       sp.diags(np.where(Y, D, 1).astype(np.float64))], format = 'csr')
+        self.model.addMConstr(A, self.z + self.delta, np.where(Y, GRB.LESS_EQUAL, GRB.GREATER_EQUAL), 
+                              np.where(Y, D, 1).astype(np.float64), name="sampleConstraint")
 
         
     def generateRule(self, X, Y, args):
         '''
         Solve the IP Pricing problem to generate new rule(s)
         '''
-        self.model = gp.Model('masterLP')
-        self.initModel(X,Y)
+        #Constraints only depend on the data sample, the model is only rebuilt when the sample changes
+        if not self.isCached(X, Y, args):
+            self.model = gp.Model('masterLP')
+            self.initModel(X,Y)
+            self.sampleKey, self.cachedY = self.getSampleKey(X, args), np.array(Y)
+            self.startSolutions = []
                            
         returnAllSolutions = args['returnAllSolutions'] if 'returnAllSolutions' in args else True
         verbose = args['verbose'] if 'verbose' in args else False
@@ -66,12 +71,16 @@ class DNF_IP_RuleGenerator(RuleGenerator):
         self.model.setObjective(objective, GRB.MINIMIZE)
         self.model.Params.OutputFlag = verbose
         
-        if 'timeLimit' in args:
-            self.model.Params.TimeLimit = args['timeLimit']
+        self.model.Params.TimeLimit = args['timeLimit'] if 'timeLimit' in args else GRB.INFINITY
         
         #Solve
+        self.setStarts()
         self.model.update()
         self.model.optimize()
+        self.saveSolutions()
+        
+        #Lower bound on the reduced cost of any rule (objective does not include the lam term of the rule intercept)
+        self.minReducedCost = self.model.ObjBound + args['lam'] if self.model.SolCount > 0 else None
         
         #Only return rules with negative reduced costs
         if self.model.objVal < -1*args['lam']:
@@ -85,6 +94,44 @@ class DNF_IP_RuleGenerator(RuleGenerator):
             print('No rules with reduced costs generated.')
             return [], []
             
+    def getSampleKey(self, X, args):
+        '''
+        Identifies the data sample by the rows/columns selected by the sampler (None if not supplied,
+        the model is then rebuilt on every call)
+        '''
+        if 'row_samples' not in args or args['row_samples'] is None:
+            return None
+        
+        col_samples = args['col_samples'] if 'col_samples' in args else None
+        return (X.shape, np.asarray(args['row_samples']).tobytes(), 
+                None if col_samples is None else np.asarray(col_samples).tobytes())
+    
+    def isCached(self, X, Y, args):
+        '''
+        Checks whether the cached model was built for this data sample (labels are compared as a sanity check)
+        '''
+        key = self.getSampleKey(X, args)
+        return key is not None and key == self.sampleKey and np.array_equal(self.cachedY, Y)
+    
+    def setStarts(self):
+        '''
+        Seeds the solve with the rules of the previous solution pool (the solver completes delta)
+        '''
+        self.model.NumStart = len(self.startSolutions)
+        self.model.update()
+        for i, solution in enumerate(self.startSolutions):
+            self.model.Params.StartNumber = i
+            self.model.setAttr('Start', self.z, solution)
+    
+    def saveSolutions(self):
+        '''
+        Keeps the rules of the solution pool to seed the next solve
+        '''
+        self.startSolutions = []
+        for i in range(self.model.SolCount):
+            self.model.Params.SolutionNumber = i
+            self.startSolutions.append(self.model.getAttr(GRB.Attr.Xn, self.z))
+    
     def getBestRule(self):
         '''
         Returns optimal solution
@@ -111,7 +158,8 @@ class DNF_IP_RuleGenerator(RuleGenerator):
             rules.append(self.model.getAttr(GRB.Attr.Xn)[0:len(self.z)])
             objs.append(obj)
         
-        return rules, objs
+        #Round solution values of the binary feature variables
+        return RuleSet.fromDense(np.array(rules).reshape(-1, len(self.z)) > 0.5), objs
 
 
 
@@ -3,6 +3,10 @@ import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 from .RuleGenerator import RuleGenerator
+from .PricingPool import PricingPool
+from RuleSet import RuleSet
+from DataSource import DataSource
+from coverage_engine.CoverageCache import CoverageCache
 import time
 
 class GreedyRuleGenerator(RuleGenerator):
@@ -15,6 +19,19 @@ class GreedyRuleGenerator(RuleGenerator):
         self.fairnessModule = fairnessModule
         self.ruleComplex = 5
         self.numRulesToKeep = args['numRulesToKeep'] if 'numRulesToKeep' in args else 20
+        self.cacheSize = args['coverageCacheSize'] if 'coverageCacheSize' in args else 4096
+        self.coverageCache = None
+        #Pricing casts the data to float64 in chunks of at most args['memoryBudget'] bytes
+        self.memoryBudget = args['memoryBudget'] if 'memoryBudget' in args else None
+        
+        #Skip beam entries whose descendants cannot reach a negative reduced cost (args['greedyPruning'])
+        self.pruning = args['greedyPruning'] if 'greedyPruning' in args else True
+        self.nodesEvaluated = 0
+        self.nodesPruned = 0
+        
+        #Beam expansion is split across a persistent pool of processes if args['pricingProcesses'] > 1
+        self.numProcesses = args['pricingProcesses'] if 'pricingProcesses' in args else 1
+        self.pricingPool = PricingPool(self.numProcesses, self.memoryBudget) if self.numProcesses > 1 else None
         
         
     def generateRule(self, X, Y, args):
@@ -30,51 +47,135 @@ class GreedyRuleGenerator(RuleGenerator):
             start_time = time.time()
             timed = True
 
-        feature_set = [[]]
+        #Coverage of the rules in the beam is cached, so extensions only AND one column
+        if 'coverageCache' not in args or args['coverageCache'] is None:
+            args['coverageCache'] = CoverageCache(lambda j: X[:,j] != 0, np.ones(X.shape[0], dtype = np.bool_),
+                                                  maxEntries = self.cacheSize)
+        self.coverageCache = args['coverageCache']
+
+        #Reduced cost is linear in the coverage for most fairness modules, all extensions are then priced at once
+        weights = self.fairnessModule.computeSampleWeights(Y, args)
+        data = DataSource(X, self.memoryBudget)
+        if weights is not None and self.pricingPool is not None:
+            self.pricingPool.load(X, weights)
+
+        feature_set = np.zeros((1, 0), dtype = np.int64)
         good_rules = []
         good_rule_obj = []
+        
+        #The beam does not search all rules, so it gives no bound on the reduced cost
+        self.minReducedCost = None
 
         for i in range(self.ruleComplex):
-            newFeatures = []
-            res = []
-            for f in feature_set:
-                for i in range(X.shape[1]):
-                    #If the feature is already in the feature set move on
-                    if i in f:
-                        continue
-                    
-                    #Create new feature set
-                    newF = np.concatenate([f, [i]]).astype(np.int64)
-                    newFeatures.append(newF)
-                    
-                    #Compute objective
-                    obj = self.fairnessModule.computeObjective(X, Y, newF, args)
-                    res.append(obj)
-                    
-                    #If reduced cost is negative add to rules
-                    if obj < 0:
-                        rule = np.zeros(X.shape[1])
-                        rule[newF] = 1
-                        good_rules.append(rule)
-                        good_rule_obj.append(obj)
-                    
-                    if timed:
-                        if time.time() - start_time > timeLimit:
-                            break
-                            
-                if timed:
-                    if time.time() - start_time > timeLimit:
-                        break
-            if timed:
-                if time.time() - start_time > timeLimit:
+            if weights is not None:
+                newFeatures, res, bound = self.expandBeam(data, feature_set, weights, args['lam'])
+                timedOut = timed and time.time() - start_time > timeLimit
+            else:
+                newFeatures, res, timedOut = self.expandBeamLoop(X, Y, feature_set, args, 
+                                                                 start_time + timeLimit if timed else None)
+                bound = None
+            self.nodesEvaluated += len(res)
+            
+            #If reduced cost is negative add to rules
+            good_rules.extend(newFeatures[res < 0])
+            good_rule_obj.extend(res[res < 0])
+            
+            if timedOut:
+                break
+            
+            #Prune rules whose descendants cannot reach a negative reduced cost
+            if self.pruning and bound is not None and i < self.ruleComplex - 1:
+                promising = bound < 0
+                self.nodesPruned += int(np.sum(~promising))
+                newFeatures, res = newFeatures[promising], res[promising]
+                if len(res) == 0:
                     break
+            
             #Adjust feature set to features of size i, best numKeep number
-            feature_set = np.array(newFeatures)[np.argsort(res)][:self.numRulesToKeep] 
+            feature_set = newFeatures[np.argsort(res)][:self.numRulesToKeep] 
             
         #Only return rules with negative reduced costs
-        return good_rules, good_rule_obj
-
+        return RuleSet.fromFeatureSets(good_rules, X.shape[1]), good_rule_obj
+    
+    def expandBeam(self, data, feature_set, weights, lam):
+        '''
+        Prices all single-feature extensions of the rules in the beam at once:
+        reduced cost of (rule + j) = lam*(len(rule)+2) + (coverage of rule * sample weights) . X[:,j]
+        - Also bounds the reduced cost of any descendant of each extension: adding features only shrinks
+          coverage, so at best only the samples with negative weight stay covered (and the complexity
+          term is the one of the longest rule if lam < 0)
+        - Extensions are returned in canonical (sorted) form, each distinct rule once
+        - data is a DataSource over the sampled data (the product is computed chunk by chunk)
+        - Returns the extended feature sets (one per row), their reduced costs and the descendant bounds
+        '''
+        length = feature_set.shape[1] + 1
+        if self.pricingPool is not None:
+            #Data and weights were loaded into the pool for this pricing call
+            rc, bound = self.pricingPool.price(feature_set, lam, self.ruleComplex)
+        else:
+            coverage = np.array([self.coverageCache.covered(f) for f in feature_set])
+            weighted = data.leftMultiply(np.vstack([coverage*weights, coverage*np.minimum(weights, 0)]))
+            rc = weighted[:len(feature_set)] + lam*(length + 1)
+            bound = weighted[len(feature_set):] + lam*(1 + (self.ruleComplex if lam < 0 else length + 1))
+        
+        #Features already in the rule are not extensions
+        valid = np.ones(rc.shape, dtype = np.bool_)
+        valid[np.arange(len(feature_set))[:, None], feature_set] = False
+        beam, feature = np.nonzero(valid)
+        newFeatures = np.sort(np.hstack([feature_set[beam], feature[:, None]]), axis = 1)
+        
+        #Keep the first extension of every distinct rule (i.e. [3, 7] from [3] + 7 and not from [7] + 3)
+        first = np.sort(np.unique(newFeatures, axis = 0, return_index = True)[1])
+        beam, feature = beam[first], feature[first]
         
-                    
+        return newFeatures[first], rc[beam, feature], bound[beam, feature]
+    
+    def stats(self):
+        return {'nodesEvaluated': self.nodesEvaluated, 'nodesPruned': self.nodesPruned}
+    
+    def resetStats(self):
+        self.nodesEvaluated = 0
+        self.nodesPruned = 0
+    
+    def close(self):
+        '''
+        Shuts down the pricing processes (restarted by the next pricing call)
+        '''
+        if self.pricingPool is not None:
+            self.pricingPool.close()
+    
+    def expandBeamLoop(self, X, Y, feature_set, args, deadline = None):
+        '''
+        Prices the single-feature extensions of the rules in the beam one at a time
+        (fairness modules whose reduced cost is not linear in the coverage)
+        - Extensions are enumerated in canonical (sorted) form, each distinct rule is scored once
+        - Returns the extended feature sets, their reduced costs and whether the deadline passed
+        '''
+        newFeatures = []
+        res = []
+        visited = set()
+        timedOut = False
+        for f in feature_set:
+            for i in range(X.shape[1]):
+                #If the feature is already in the feature set move on
+                if i in f:
+                    continue
+                
+                #Skip rules already generated from another rule in the beam
+                newF = np.sort(np.concatenate([f, [i]]).astype(np.int64))
+                key = tuple(newF)
+                if key in visited:
+                    continue
+                visited.add(key)
+                
+                #Create new feature set and compute objective
+                newFeatures.append(newF)
+                res.append(self.fairnessModule.computeObjective(X, Y, newFeatures[-1], args))
+                
+                timedOut = deadline is not None and time.time() > deadline
+                if timedOut:
+                    break
+            if timedOut:
+                break
         
-            
\ No newline at end of file
+        return np.array(newFeatures, dtype = np.int64).reshape(len(newFeatures), -1), np.array(res), timedOut
@@ -29,6 +29,8 @@ class HybridGenerator(RuleGenerator):
         if self.rule_count < 4 and self.doGreedy:
             #print('Hybrid using greedy')
             rules, objs = self.greedy.generateRule(X,Y,args)
+            #Greedy pricing gives no bound on the reduced cost
+            self.minReducedCost = None
             
             if len(rules) == 0:
                 self.doGreedy = False
@@ -36,10 +38,21 @@ class HybridGenerator(RuleGenerator):
         if self.rule_count >= 4 or not self.doGreedy:
             #print('Hybrid using IP')
             rules, objs = self.ip.generateRule(X,Y,args) 
+            self.minReducedCost = self.ip.minReducedCost
         
         self.rule_count += 1
         return rules, objs
     
+    def stats(self):
+        return self.greedy.stats()
+    
+    def resetStats(self):
+        self.greedy.resetStats()
+    
+    def close(self):
+        self.greedy.close()
+        self.ip.close()
+    
     def isFirstStage(self, args):
         if 'timeLeft' in args and 'timeLimit' in args:
             return float(args['timeLeft']) > 2 * float(args['timeLimit'])
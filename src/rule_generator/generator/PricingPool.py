@@ -0,0 +1,131 @@
+import numpy as np
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from DataSource import DataSource
+
+#Shared memory block attached by a worker process (name -> (block, (X, weights))), the data of the
+#current pricing call stays attached until a task of the next call arrives
+_attached = {}
+
+def _attach(spec):
+    '''
+    Returns the (X, weights) views of the shared data block described by 
+    spec = (name, rows, columns, dtype, memoryBudget), the weights as float64 are followed by X in its own dtype
+    '''
+    name, rows, columns, dtype = spec[:4]
+    if name not in _attached:
+        for block, views in _attached.values():
+            block.close()
+        _attached.clear()
+
+        block = shared_memory.SharedMemory(name = name)
+        weights = np.ndarray(rows, dtype = np.float64, buffer = block.buf)
+        X = np.ndarray((rows, columns), dtype = dtype, buffer = block.buf, offset = rows*8)
+        _attached[name] = (block, (X, weights))
+
+    return _attached[name][1]
+
+def _priceChunk(dataSpec, feature_set, lam, ruleComplex):
+    '''
+    Reduced costs and descendant bounds of all single-feature extensions of a chunk of the beam
+    (see GreedyRuleGenerator.expandBeam), computed in a worker process from the shared data
+    '''
+    X, weights = _attach(dataSpec)
+
+    coverage = np.ones((len(feature_set), X.shape[0]), dtype = np.bool_)
+    for i, f in enumerate(feature_set):
+        if len(f) > 0:
+            coverage[i] = np.all(X[:, f] != 0, axis = 1)
+
+    #The data is cast to float64 in chunks (the memory budget is split between the workers)
+    length = feature_set.shape[1] + 1
+    W = np.vstack([coverage*weights, coverage*np.minimum(weights, 0)])
+    weighted = DataSource(X, dataSpec[4]).leftMultiply(W)
+    rc = weighted[:len(feature_set)] + lam*(length + 1)
+    bound = weighted[len(feature_set):] + lam*(1 + (ruleComplex if lam < 0 else length + 1))
+
+    return rc, bound
+
+def _shutdown(executor):
+    '''
+    Stops the worker processes without waiting for pending tasks
+    '''
+    executor.shutdown(wait = False, cancel_futures = True)
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        process.terminate()
+
+def _unlink(block):
+    block.close()
+    block.unlink()
+
+class PricingPool(object):
+    '''
+    Persistent pool of worker processes for greedy pricing.
+    - The sampled data (in its own dtype) and sample weights of a pricing call are copied once into a 
+      shared memory block (workers attach to it by name, nothing large is pickled per task), a block 
+      larger than memoryBudget (args['memoryBudget']) raises an exception
+    - The beam is split into contiguous chunks (one per process), results are merged in chunk order
+      so they do not depend on which worker finishes first
+    - The pool is started on first use and lives until close(), workers and the shared block are also
+      released when the pool is garbage collected or the interpreter exits (weakref.finalize)
+    '''
+
+    def __init__(self, numProcesses, memoryBudget = None):
+        self.numProcesses = numProcesses
+        self.memoryBudget = memoryBudget if memoryBudget is not None else 256*1024**2
+        self.executor = None
+        self.block = None
+        self.dataSpec = None
+        self.executorFinalizer = None
+        self.blockFinalizer = None
+
+    def load(self, X, weights):
+        '''
+        Copies the sampled data and the sample weights of a pricing call into a new shared memory block
+        (the weights as float64 followed by X in its own dtype), releasing the block of the previous call
+        '''
+        self.release()
+
+        rows, columns = X.shape
+        size = rows*8 + rows*columns*X.dtype.itemsize
+        if size > self.memoryBudget:
+            raise Exception('Shared pricing data (%d bytes) exceeds the memory budget (%d bytes), use row sampling, '
+                            'increase args[\'memoryBudget\'] or price in a single process!'%(size, self.memoryBudget))
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers = self.numProcesses)
+            self.executorFinalizer = weakref.finalize(self, _shutdown, self.executor)
+
+        self.block = shared_memory.SharedMemory(create = True, size = max(1, size))
+        self.blockFinalizer = weakref.finalize(self, _unlink, self.block)
+        np.ndarray(rows, dtype = np.float64, buffer = self.block.buf)[:] = weights
+        np.ndarray((rows, columns), dtype = X.dtype, buffer = self.block.buf, offset = rows*8)[:] = X
+        self.dataSpec = (self.block.name, rows, columns, X.dtype.str, max(1, self.memoryBudget//self.numProcesses))
+
+    def price(self, feature_set, lam, ruleComplex):
+        '''
+        Returns reduced costs and descendant bounds (beam x features) of all extensions of the beam
+        '''
+        chunks = [chunk for chunk in np.array_split(feature_set, min(self.numProcesses, len(feature_set)))
+                  if len(chunk) > 0]
+        futures = [self.executor.submit(_priceChunk, self.dataSpec, chunk, lam, ruleComplex) for chunk in chunks]
+        results = [future.result() for future in futures]
+
+        return np.vstack([rc for rc, bound in results]), np.vstack([bound for rc, bound in results])
+
+    def release(self):
+        if self.block is not None:
+            self.blockFinalizer()
+            self.block, self.blockFinalizer = None, None
+            self.dataSpec = None
+
+    def close(self):
+        '''
+        Shuts down the worker processes and frees the shared data
+        '''
+        if self.executor is not None:
+            self.executorFinalizer.detach()
+            self.executor.shutdown()
+            self.executor, self.executorFinalizer = None, None
+        self.release()
@@ -10,8 +10,12 @@ class RuleGenerator(object):
     To add a new type of RuleModel:
         - Create a new child class
         - Specify how to generate a rule (taking in various arguments)
+        - Set minReducedCost to a lower bound on the reduced cost of any rule from the last call
+          (only exact pricing gives one, None otherwise)
     '''
     
+    minReducedCost = None
+    
     def __init__(self, fairnessModule, args = {}):
         pass
         
@@ -21,6 +25,24 @@ class RuleGenerator(object):
         - Needs to be specified in the child class
         '''
         pass            
+    
+    def stats(self):
+        '''
+        Returns search counters of the generator (if any)
+        '''
+        return {}
+    
+    def resetStats(self):
+        '''
+        Resets the search counters (i.e. at the start of a fit)
+        '''
+        pass
+    
+    def close(self):
+        '''
+        Releases resources held between pricing calls (i.e. worker processes)
+        '''
+        pass
 
         
             
\ No newline at end of file
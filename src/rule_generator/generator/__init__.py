@@ -1 +1 @@
-__all__ = ["DNF_IP_RuleGenerator", "GreedyRuleGenerator", "HybridGenerator","DNF_IP_RuleGeneratorOpt"]
+__all__ = ["DNF_IP_RuleGenerator", "GreedyRuleGenerator", "HybridGenerator","DNF_IP_RuleGeneratorOpt", "PricingPool"]
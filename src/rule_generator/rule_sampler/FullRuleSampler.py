@@ -13,11 +13,7 @@ class FullRuleSampler(RuleSampler):
     def getRules(self, rules, reduced_costs, col_samples):
         
         #Get rules back into non-subsampled format
-        final_rules = []
-        for rule in rules:
-            fin_rule = np.zeros(len(col_samples))
-            fin_rule[col_samples] = rules[rule]
-            final_rules.append(fin_rule)
+        final_rules = self.toFullColumns(rules, col_samples)
         
         #Return all rules
         return final_rules, reduced_costs
\ No newline at end of file
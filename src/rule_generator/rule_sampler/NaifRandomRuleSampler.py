@@ -18,12 +18,6 @@ class NaifRandomRuleSampler(RuleSampler):
         rules_to_return = np.random.choice(range(len(rules)), returnNum, replace = False)
         
         #Convert to non-subsampled form (for cols)
-        final_rules = []
-        rules = np.array(rules)
-        for rule in rules_to_return:
-            fin_rule = np.zeros(len(col_samples))
-            fin_rule[col_samples] = rules[rule]
-            final_rules.append(fin_rule)
-            
+        final_rules = self.toFullColumns(rules, col_samples)[rules_to_return]
 
         return final_rules, np.array(reduced_costs)[rules_to_return]
\ No newline at end of file
@@ -1,3 +1,6 @@
+import numpy as np
+from RuleSet import RuleSet
+
 class RuleSampler(object):
     '''
     Parent class to object that generates new rules.
@@ -14,7 +17,11 @@ class RuleSampler(object):
         Takes a set of rules and returns K_p, and K_z coefficient
         - Needs to be specified in the child class
         '''
-        pass            
-
-        
-            
\ No newline at end of file
+        pass
+    
+    def toFullColumns(self, rules, col_samples):
+        '''
+        Maps rules found on the sampled columns back to the columns of the full data
+        '''
+        rules = RuleSet.asRuleSet(rules, int(np.sum(col_samples)))
+        return rules.mapFeatures(np.nonzero(col_samples)[0], len(col_samples))
@@ -24,11 +24,6 @@ class SoftmaxRandomRuleSampler(RuleSampler):
         rules_to_return = list(np.random.choice(len(rules), returnNum, p=probs, replace = False))
         
         #Convert rules to non-subsampled form
-        final_rules = []
-        rules = np.array(rules)
-        for rule in rules_to_return:
-            fin_rule = np.zeros(len(col_samples))
-            fin_rule[col_samples] = rules[rule]
-            final_rules.append(fin_rule)
+        final_rules = self.toFullColumns(rules, col_samples)[rules_to_return]
             
         return final_rules, np.array(reduced_costs)[rules_to_return]
\ No newline at end of file
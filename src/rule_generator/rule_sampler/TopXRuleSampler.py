@@ -15,11 +15,6 @@ class TopXRuleSampler(RuleSampler):
         sorted_rc = np.argsort(reduced_costs)
         
         #Convert to non-subsampled form
-        final_rules = []
-        rules = np.array(rules)
-        for rule in sorted_rc[:self.numRulesToReturn]:
-            fin_rule = np.zeros(len(col_samples))
-            fin_rule[col_samples] = rules[rule]
-            final_rules.append(fin_rule)
+        final_rules = self.toFullColumns(rules, col_samples)[sorted_rc[:self.numRulesToReturn]]
 
         return final_rules, np.array(reduced_costs)[sorted_rc[:self.numRulesToReturn]]
\ No newline at end of file